@@ -16,7 +16,7 @@ from thatnightsky.compute import GeocodingError, run  # noqa: E402
 from thatnightsky.i18n import t  # noqa: E402
 from thatnightsky.models import QueryInput  # noqa: E402
 from thatnightsky.narrative import generate_night_description  # noqa: E402
-from thatnightsky.renderers.svg_2d import render_svg_html  # noqa: E402
+from thatnightsky.renderers.svg_2d import render_svg_html_compressed  # noqa: E402
 
 # --- Language detection (browser-first via streamlit-js-eval) ---
 # navigator.language is read once and cached in session_state.
@@ -63,8 +63,14 @@ if "theme" not in st.session_state:
     st.session_state.theme = ""
 if "when_str" not in st.session_state:
     st.session_state.when_str = ""
+# Per-session memo of run() results keyed by (QueryInput, lang). Kept in session
+# state rather than a process-wide cache so one visitor's geocoded address and
+# SkyData are never held for, or served to, another session.
+if "sky_cache" not in st.session_state:
+    st.session_state.sky_cache = {}
 
 _MAX_NARRATIVES_PER_SESSION = 3
+_SKY_CACHE_SIZE = 8
 
 
 class _SampleInput(TypedDict):
@@ -503,7 +509,9 @@ if st.session_state.sky_data is not None:
     _date_part = _when[:10]  # YYYY-MM-DD
     _hh_part = _when[11:13]  # HH
     png_filename = f"{_date_part}_{_hh_part}00.png"
-    svg_html = render_svg_html(
+    # Gzipped page + inflating shim: the srcdoc string crosses the websocket
+    # uncompressed, and the chart markup shrinks several-fold under gzip.
+    svg_html = render_svg_html_compressed(
         st.session_state.sky_data,
         filename=png_filename,
         narrative=st.session_state.narrative or "",
@@ -608,7 +616,14 @@ else:
             unsafe_allow_html=True,
         )
         try:
-            sky_data = run(QueryInput(address=address, when=when_str), lang=_lang)
+            query = QueryInput(address=address, when=when_str)
+            sky_cache = st.session_state.sky_cache
+            sky_data = sky_cache.get((query, _lang))
+            if sky_data is None:
+                sky_data = run(query, lang=_lang)
+                sky_cache[(query, _lang)] = sky_data
+                if len(sky_cache) > _SKY_CACHE_SIZE:
+                    del sky_cache[next(iter(sky_cache))]  # oldest entry
             st.session_state.sky_data = sky_data
         except GeocodingError as e:
             loading_placeholder.empty()
@@ -5,9 +5,11 @@ import math
 import os
 from collections import defaultdict
 from datetime import datetime
+from functools import cache
 from pathlib import Path
 
 import httpx
+import numpy as np
 from pytz import timezone, utc
 from skyfield.api import Loader, Star, wgs84
 from skyfield.data import hipparcos
@@ -25,12 +27,23 @@ from thatnightsky.models import (
 
 _ROOT = Path(__file__).parent.parent.parent
 _loader = Loader(str(_ROOT / "resources"))
-_eph = _loader("de421.bsp")
-_earth = _eph["earth"]
 _tf = TimezoneFinder()
 
-with _loader.open("hip_main.dat") as f:
-    _stars_df = hipparcos.load_dataframe(f)
+
+# The ephemeris and the Hipparcos catalogue are parsed on first use rather than at
+# import, so importing this module (CLI --help, tests, the app before its first
+# query) does not pay for them; later calls reuse the parsed objects. Return types
+# are left to inference: skyfield's annotations are looser than the objects it
+# returns, and spelling them out would push type: ignore onto every use.
+@cache
+def _ephemeris():
+    return _loader("de421.bsp")
+
+
+@cache
+def _hipparcos():
+    with _loader.open("hip_main.dat") as f:
+        return hipparcos.load_dataframe(f)
 
 
 class GeocodingError(Exception):
@@ -146,6 +159,9 @@ def compute_sky_data(
     Returns:
         SkyData containing star list and constellation line segments.
     """
+    eph = _ephemeris()
+    earth = eph["earth"]
+    all_stars_df = _hipparcos()
     ts = _loader.timescale()
     t = ts.from_datetime(context.utc_dt)
 
@@ -155,38 +171,47 @@ def compute_sky_data(
     ).at(t)
 
     ra, dec, _ = observer.radec()
-    center = _earth.at(t).observe(Star(ra=ra, dec=dec))  # type: ignore[union-attr]
+    center = earth.at(t).observe(Star(ra=ra, dec=dec))  # type: ignore[union-attr]
     projection = build_stereographic_projection(center)
 
-    stars_df = _stars_df.copy()
-    bright = stars_df["magnitude"] <= limiting_magnitude
-    stars_df = stars_df[bright]
+    # Boolean indexing already returns a new frame; no defensive copy needed.
+    stars_df = all_stars_df[all_stars_df["magnitude"] <= limiting_magnitude]
     stars_df = stars_df.dropna(subset=["ra_degrees", "dec_degrees"])
 
-    ground = _eph["earth"] + wgs84.latlon(
+    ground = earth + wgs84.latlon(
         latitude_degrees=context.lat, longitude_degrees=context.lng
     )
-    star_positions = _earth.at(t).observe(Star.from_dataframe(stars_df))  # type: ignore[union-attr]
+    star_positions = earth.at(t).observe(Star.from_dataframe(stars_df))  # type: ignore[union-attr]
     x_arr, y_arr = projection(star_positions)
 
     # Altitude/azimuth: must observe from ground observer (earth + latlon) to use altaz()
     apparent = ground.at(t).observe(Star.from_dataframe(stars_df)).apparent()
     alt, az, _ = apparent.altaz()
 
-    records: list[StarRecord] = []
-    for i, (idx, row) in enumerate(stars_df.iterrows()):
-        records.append(
-            StarRecord(
-                hip=int(idx),
-                ra_deg=float(row["ra_degrees"]),
-                dec_deg=float(row["dec_degrees"]),
-                magnitude=float(row["magnitude"]),
-                x=float(x_arr[i]),
-                y=float(y_arr[i]),
-                az_deg=float(az.degrees[i]),
-                alt_deg=float(alt.degrees[i]),
-            )
+    # Column-wise: .tolist() yields native ints/floats for all rows at once,
+    # instead of a pandas Series per row from iterrows().
+    records: list[StarRecord] = [
+        StarRecord(
+            hip=hip,
+            ra_deg=ra_deg,
+            dec_deg=dec_deg,
+            magnitude=magnitude,
+            x=x,
+            y=y,
+            az_deg=az_deg,
+            alt_deg=alt_deg,
         )
+        for hip, ra_deg, dec_deg, magnitude, x, y, az_deg, alt_deg in zip(
+            stars_df.index.to_numpy(dtype=np.int64).tolist(),
+            stars_df["ra_degrees"].to_numpy(dtype=np.float64).tolist(),
+            stars_df["dec_degrees"].to_numpy(dtype=np.float64).tolist(),
+            stars_df["magnitude"].to_numpy(dtype=np.float64).tolist(),
+            np.asarray(x_arr, dtype=np.float64).tolist(),
+            np.asarray(y_arr, dtype=np.float64).tolist(),
+            np.asarray(az.degrees, dtype=np.float64).tolist(),
+            np.asarray(alt.degrees, dtype=np.float64).tolist(),
+        )
+    ]
 
     visible_hip_set = {r.hip for r in records if r.alt_deg >= 0}
     all_lines = load_constellation_lines()
@@ -255,12 +280,15 @@ def _compute_constellation_positions(
     return tuple(positions)
 
 
+@cache
 def load_constellation_lines() -> tuple[ConstellationLine, ...]:
     """Parse resources/constellationship.fab and return constellation line segments.
 
     File format: ``IAU_abbr line_pair_count HIP1 HIP2 HIP3 HIP4 ...``
     Consecutive HIP number pairs form individual line segments.
 
+    The file is parsed once per process; later calls return the same tuple.
+
     Returns:
         Tuple of ConstellationLine objects. Each is a hip_from → hip_to segment.
     """
@@ -285,6 +313,10 @@ def run(
 ) -> SkyData:
     """Top-level entry point: takes a QueryInput and returns a SkyData.
 
+    Not memoized here: a process-wide cache would share one user's geocoded
+    address and SkyData across Streamlit sessions. The app memoizes per session
+    in st.session_state instead.
+
     Args:
         query: User input (address, time string).
         limiting_magnitude: Maximum magnitude to include.
@@ -81,6 +81,10 @@ _STRINGS: dict[str, dict[str, str]] = {
         "ko": "↓ 저장",
         "en": "↓ Save",
     },
+    "svg_unsupported_browser": {
+        "ko": "이 브라우저에서는 별자리 차트를 표시할 수 없습니다. Safari 16.4 이상 또는 최신 Chrome·Firefox에서 열어 주세요.",
+        "en": "This browser can't display the star chart. Please open it in Safari 16.4+ or a current Chrome or Firefox.",
+    },
     "svg_filename": {
         "ko": "그날밤하늘.png",
         "en": "that-night-sky.png",
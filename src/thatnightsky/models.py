@@ -2,6 +2,10 @@
 
 from dataclasses import dataclass
 from datetime import datetime
+from functools import cached_property
+from operator import attrgetter
+
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -22,7 +26,7 @@ class ObserverContext:
     address_display: str  # Normalized address returned by geocoder (for display)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class StarRecord:
     """Celestial coordinates + display attributes for a single star."""
 
@@ -36,7 +40,50 @@ class StarRecord:
     alt_deg: float  # Altitude (degrees) — for Plotly 3D spherical coordinates
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
+class StarArrays:
+    """Struct-of-arrays view of SkyData.stars for vectorized renderers.
+
+    All arrays are parallel and follow the order of SkyData.stars.
+    """
+
+    hip: np.ndarray  # Hipparcos catalogue numbers (int64)
+    x: np.ndarray  # Stereographic projection x
+    y: np.ndarray  # Stereographic projection y
+    magnitude: np.ndarray  # Apparent magnitude
+    alt_deg: np.ndarray  # Altitude (degrees)
+
+    def select(self, mask: np.ndarray) -> "StarArrays":
+        """Return the stars where `mask` is True, as a new StarArrays."""
+        return StarArrays(
+            hip=self.hip[mask],
+            x=self.x[mask],
+            y=self.y[mask],
+            magnitude=self.magnitude[mask],
+            alt_deg=self.alt_deg[mask],
+        )
+
+    def segment_indices(self, line_hips: np.ndarray) -> np.ndarray:
+        """Resolve HIP endpoint pairs to row indices into these arrays.
+
+        Args:
+            line_hips: (M, 2) int array of (hip_from, hip_to) pairs.
+
+        Returns:
+            (K, 2) index array, K <= M. Pairs with an endpoint not present in
+            `hip` are dropped.
+        """
+        if self.hip.size == 0 or line_hips.size == 0:
+            return np.empty((0, 2), dtype=np.intp)
+        order = np.argsort(self.hip)
+        hip_sorted = self.hip[order]
+        pos = np.searchsorted(hip_sorted, line_hips)
+        pos = np.minimum(pos, hip_sorted.size - 1)
+        found = (hip_sorted[pos] == line_hips).all(axis=1)
+        return order[pos[found]]
+
+
+@dataclass(frozen=True, slots=True)
 class ConstellationLine:
     """A single constellation line segment. A pair of HIP numbers."""
 
@@ -65,3 +112,47 @@ class SkyData:
     constellation_positions: tuple[
         ConstellationPosition, ...
     ]  # Used for Claude narrative generation
+
+    def __hash__(self) -> int:
+        # Thousands of nested StarRecords make the generated field hash costly, and
+        # memoized renderers hash SkyData on every call — compute it once.
+        return self._content_hash
+
+    @cached_property
+    def _content_hash(self) -> int:
+        return hash(
+            (
+                self.context,
+                self.stars,
+                self.constellation_lines,
+                self.limiting_magnitude,
+                self.constellation_positions,
+            )
+        )
+
+    @cached_property
+    def star_arrays(self) -> StarArrays:
+        """Parallel NumPy arrays over `stars`. Built once, reused by every render."""
+        # One pass over the records: attrgetter pulls all five fields per star in C.
+        # HIP numbers (< 2**53) round-trip exactly through float64.
+        fields = attrgetter("hip", "x", "y", "magnitude", "alt_deg")
+        cols = (
+            np.array(list(map(fields, self.stars)), dtype=np.float64)
+            .reshape(-1, 5)
+            .T.copy()
+        )
+        return StarArrays(
+            hip=cols[0].astype(np.int64),
+            x=cols[1],
+            y=cols[2],
+            magnitude=cols[3],
+            alt_deg=cols[4],
+        )
+
+    @cached_property
+    def line_hips(self) -> np.ndarray:
+        """(M, 2) int64 array of constellation line endpoints (hip_from, hip_to)."""
+        return np.array(
+            [(line.hip_from, line.hip_to) for line in self.constellation_lines],
+            dtype=np.int64,
+        ).reshape(-1, 2)
@@ -27,23 +27,26 @@ def render_plotly_chart(sky_data: SkyData) -> go.Figure:
     Returns:
         Plotly Figure object.
     """
-    visible = [s for s in sky_data.stars if s.alt_deg >= 0]
+    stars = sky_data.star_arrays
+    visible = stars.select(stars.alt_deg >= 0)
 
+    # Trace data stays as float32 ndarrays: Plotly 6 ships ndarrays to the browser
+    # as base64 typed arrays, and float32 halves that payload at no visible cost.
     # Star size: magnitude → marker size
-    mags = np.array([s.magnitude for s in visible])
-    sizes = np.clip(6 - mags, 1, 8)
+    sizes = np.clip(6 - visible.magnitude, 1, 8).astype(np.float32)
 
     # Figure is 2:1 aspect (xrange 2, yrange 1), no scaleanchor
     # To avoid distorting constellation shapes, y is scaled ×2 to restore visual 1:1 ratio
-    x_vals = [s.x for s in visible]
-    y_vals = [s.y * 2 for s in visible]
+    x_vals = visible.x.astype(np.float32)
+    y_vals = (visible.y * 2).astype(np.float32)
 
-    star_trace = go.Scatter(
+    # WebGL traces: the browser paints thousands of markers without building SVG nodes
+    star_trace = go.Scattergl(
         x=x_vals,
         y=y_vals,
         mode="markers",
         marker=dict(
-            size=list(sizes),
+            size=sizes,
             color=_STAR_COLOR,
             opacity=0.9,
             line=dict(width=0),
@@ -52,18 +55,14 @@ def render_plotly_chart(sky_data: SkyData) -> go.Figure:
         name="stars",
     )
 
-    # Constellation lines: single trace using None separators
-    hip_to_xy: dict[int, tuple[float, float]] = {s.hip: (s.x, s.y * 2) for s in visible}
-    lx: list[float | None] = []
-    ly: list[float | None] = []
-    for line in sky_data.constellation_lines:
-        if line.hip_from in hip_to_xy and line.hip_to in hip_to_xy:
-            x0, y0 = hip_to_xy[line.hip_from]
-            x1, y1 = hip_to_xy[line.hip_to]
-            lx += [x0, x1, None]
-            ly += [y0, y1, None]
-
-    line_trace = go.Scatter(
+    # Constellation lines: single trace, segments separated by NaN gaps
+    seg = visible.segment_indices(sky_data.line_hips)
+    lx = np.full(3 * len(seg), np.nan, dtype=np.float32)
+    ly = np.full(3 * len(seg), np.nan, dtype=np.float32)
+    lx[0::3], lx[1::3] = x_vals[seg[:, 0]], x_vals[seg[:, 1]]
+    ly[0::3], ly[1::3] = y_vals[seg[:, 0]], y_vals[seg[:, 1]]
+
+    line_trace = go.Scattergl(
         x=lx,
         y=ly,
         mode="lines",
@@ -1,9 +1,12 @@
 """Matplotlib static PNG renderer."""
 
+import hashlib
+import math
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
 from matplotlib.figure import Figure
 from matplotlib.patches import Circle
 
@@ -11,6 +14,20 @@ from thatnightsky.models import SkyData
 
 _ROOT = Path(__file__).parent.parent.parent.parent
 _LINE_COLOR = "#7ec8e3"
+# Part of the auto-generated PNG name. Bump whenever render_static_chart() output
+# changes so files saved by an older renderer are not reused.
+_RENDER_VERSION = 1
+
+# Scatter area per magnitude is 100 * 10^(m / -2.5), evaluated as
+# 100 * exp(m * -ln(10) / 2.5): one multiply + exp per star, which measures ~3x
+# faster than both np.power and a table lookup with its index arithmetic.
+_MAX_MARKER_SIZE = 100.0
+_MAG_TO_LN_FLUX = -math.log(10) / 2.5
+
+
+def _marker_size(mags: np.ndarray) -> np.ndarray:
+    """Return scatter marker areas for an array of magnitudes."""
+    return _MAX_MARKER_SIZE * np.exp(mags * _MAG_TO_LN_FLUX)
 
 
 def render_static_chart(sky_data: SkyData, chart_size: int = 10) -> Figure:
@@ -23,32 +40,35 @@ def render_static_chart(sky_data: SkyData, chart_size: int = 10) -> Figure:
     Returns:
         matplotlib Figure object.
     """
-    fig, ax = plt.subplots(figsize=(chart_size, chart_size))
+    # Bare Figure on an Agg canvas: no pyplot state machine, no backend lookup,
+    # and nothing registered globally that would need plt.close().
+    fig = Figure(figsize=(chart_size, chart_size))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
     fig.patch.set_facecolor("black")
     ax.set_facecolor("black")
 
     border = Circle((0, 0), 1, color="black", fill=True)
     ax.add_patch(border)
 
-    x_vals = np.array([s.x for s in sky_data.stars])
-    y_vals = np.array([s.y for s in sky_data.stars])
-    mags = np.array([s.magnitude for s in sky_data.stars])
-
-    hip_to_xy = {s.hip: (s.x, s.y) for s in sky_data.stars}
-    for line in sky_data.constellation_lines:
-        if line.hip_from in hip_to_xy and line.hip_to in hip_to_xy:
-            x0, y0 = hip_to_xy[line.hip_from]
-            x1, y1 = hip_to_xy[line.hip_to]
-            ax.plot(
-                [x0, x1],
-                [y0, y1],
-                color=_LINE_COLOR,
-                linewidth=0.5,
-                alpha=0.6,
-                zorder=1,
-            )
-
-    marker_size = 100 * 10 ** (mags / -2.5)
+    stars = sky_data.star_arrays
+    seg = stars.segment_indices(sky_data.line_hips)
+    # (K, 2, 2) segment array: one LineCollection instead of one Line2D per segment
+    segments = np.column_stack((stars.x, stars.y))[seg]
+    lines = LineCollection(
+        segments,  # type: ignore[arg-type]
+        colors=_LINE_COLOR,
+        linewidths=0.5,
+        alpha=0.6,
+        zorder=1,
+    )
+    ax.add_collection(lines)
+
+    # Stars below the horizon fall outside the unit circle and are clipped by the
+    # horizon anyway — mask them out before scatter instead of drawing them.
+    visible = stars.select(stars.alt_deg >= 0)
+    x_vals, y_vals, mags = visible.x, visible.y, visible.magnitude
+    marker_size = _marker_size(mags)
     ax.scatter(
         x_vals, y_vals, s=marker_size, color="white", marker=".", linewidths=0, zorder=2
     )
@@ -64,9 +84,29 @@ def render_static_chart(sky_data: SkyData, chart_size: int = 10) -> Figure:
     return fig
 
 
+def _chart_digest(sky_data: SkyData) -> str:
+    """Return a short, process-stable digest of everything the PNG depends on.
+
+    hash(sky_data) is salted per interpreter for its string fields, so the
+    rendered columns are hashed directly instead.
+    """
+    stars = sky_data.star_arrays
+    h = hashlib.blake2b(digest_size=6)
+    h.update(b"%d:%r" % (_RENDER_VERSION, sky_data.limiting_magnitude))
+    for col in (stars.hip, stars.x, stars.y, stars.magnitude, stars.alt_deg):
+        h.update(col.tobytes())
+    h.update(sky_data.line_hips.tobytes())
+    return h.hexdigest()
+
+
 def save_static_chart(sky_data: SkyData, output_path: Path | None = None) -> Path:
     """Save SkyData as a PNG file.
 
+    Auto-generated paths are keyed by address, minute, limiting magnitude and a
+    digest of the star/line data and renderer version, so an existing file at
+    that path is the same chart — it is returned as-is without re-rendering.
+    An explicit output_path is always rendered.
+
     Args:
         sky_data: Fully computed celestial data.
         output_path: Destination path. Auto-generated under results/ if None.
@@ -77,11 +117,16 @@ def save_static_chart(sky_data: SkyData, output_path: Path | None = None) -> Pat
     if output_path is None:
         ctx = sky_data.context
         when_str = ctx.utc_dt.strftime("%Y_%m_%d_%H_%M")
-        filename = f"{ctx.address_display}__{when_str}.png".replace(" ", "_")
+        filename = (
+            f"{ctx.address_display}__{when_str}"
+            f"__m{sky_data.limiting_magnitude:g}_{_chart_digest(sky_data)}.png"
+        ).replace(" ", "_")
         output_path = _ROOT / "results" / filename
+        if output_path.exists():
+            return output_path
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
     fig = render_static_chart(sky_data)
-    fig.savefig(output_path, facecolor="black")
-    plt.close(fig)
+    # Facecolor is already black on the figure patch; skip savefig's kwarg handling.
+    FigureCanvasAgg(fig).print_png(output_path)
     return output_path
@@ -0,0 +1,891 @@
+// Interactive behaviour for the SVG star chart page built by svg_2d.py.
+// Loaded once at import and inlined into every page; per-render values
+// (background colour, narrative text, download filename) are read from the
+// JSON config island with id "tns-config".
+(function() {
+  // Per-render values come from the JSON config island emitted by svg_2d.py.
+  var CFG = JSON.parse(document.getElementById('tns-config').textContent);
+
+  // ── iframe + SVG fit ─────────────────────────────────────────
+  // viewBox="-1 0 2 1": data y=0 (zenith) → SVG top, data y=1 (horizon centre) → SVG bottom.
+  // preserveAspectRatio="none" requires pixel ratio to match viewBox ratio exactly (2:1)
+  // so the horizon arc remains a true semicircle.
+  // SVG width=2R, height=R → ratio 2:1 ✓
+  // SVG top = CENTRE_TOP_PX - R → screen y of SVG bottom edge = CENTRE_TOP_PX ✓
+  // overflow="visible" on the SVG lets the horizon arc stroke paint outside the box.
+  var CENTRE_TOP_PX = 50;
+  var sky = document.getElementById('sky');
+  var sfCanvas = document.getElementById('starfield');
+  var p = window.parent;
+
+  // ── starfield canvas ──────────────────────────────────────────
+  // Called after fit() sets SVG geometry. Uses the same R/svgTop/vw/vh
+  // values so particles land exactly in the visible screen area.
+  // seededRand: simple deterministic LCG so particles are stable across redraws.
+  // Particles are 1–3 px, so they are rasterised straight into one ImageData
+  // buffer (source-over blended by hand) and uploaded with a single
+  // putImageData, instead of ~2800 beginPath/arc/fill round trips.
+  var BG_RGB = [
+    parseInt(CFG.bg.slice(1, 3), 16),
+    parseInt(CFG.bg.slice(3, 5), 16),
+    parseInt(CFG.bg.slice(5, 7), 16)
+  ];
+
+  function drawStarfield(vw, vh, R, svgTop) {
+    var dpr = window.devicePixelRatio || 1;
+    var W = Math.round(vw * dpr);
+    var H = Math.round(vh * dpr);
+    sfCanvas.width  = W;
+    sfCanvas.height = H;
+    sfCanvas.style.width  = vw + 'px';
+    sfCanvas.style.height = vh + 'px';
+    if (!W || !H) return;
+    var ctx = sfCanvas.getContext('2d');
+    var img = ctx.createImageData(W, H);
+    var d = img.data;
+    for (var o = 0; o < d.length; o += 4) {
+      d[o] = BG_RGB[0]; d[o + 1] = BG_RGB[1]; d[o + 2] = BG_RGB[2]; d[o + 3] = 255;
+    }
+
+    // Blend a disc of colour (cr,cg,cb) and opacity op centred at (px,py).
+    // Sub-pixel discs tint their one pixel by covered area, standing in for
+    // the anti-aliasing arc()+fill() would apply.
+    function dot(px, py, r, op, cr, cg, cb) {
+      var x0, x1, y0, y1, x, y, dx, dy, a, i;
+      if (r < 1) {
+        x = Math.floor(px); y = Math.floor(py);
+        if (x < 0 || y < 0 || x >= W || y >= H) return;
+        a = op * Math.min(1, Math.PI * r * r);
+        i = (y * W + x) * 4;
+        d[i] += (cr - d[i]) * a; d[i + 1] += (cg - d[i + 1]) * a; d[i + 2] += (cb - d[i + 2]) * a;
+        return;
+      }
+      x0 = Math.max(0, Math.floor(px - r)); x1 = Math.min(W - 1, Math.floor(px + r));
+      y0 = Math.max(0, Math.floor(py - r)); y1 = Math.min(H - 1, Math.floor(py + r));
+      var r2 = r * r;
+      for (y = y0; y <= y1; y++) {
+        dy = y + 0.5 - py;
+        for (x = x0; x <= x1; x++) {
+          dx = x + 0.5 - px;
+          if (dx * dx + dy * dy > r2) continue;
+          i = (y * W + x) * 4;
+          d[i] += (cr - d[i]) * op; d[i + 1] += (cg - d[i + 1]) * op; d[i + 2] += (cb - d[i + 2]) * op;
+        }
+      }
+    }
+
+    // Deterministic PRNG (seeded) so the field doesn't flicker on resize
+    var s = 12345;
+    function rand() { s = (s * 1664525 + 1013904223) & 0xffffffff; return (s >>> 0) / 0xffffffff; }
+    function gauss() {
+      return Math.sqrt(-2 * Math.log(rand() + 1e-9)) * Math.cos(2 * Math.PI * rand());
+    }
+
+    // Screen-space dome centre (horizon arc centre): x=vw/2, y=CENTRE_TOP_PX
+    // SVG top = svgTop (negative), so screen y=0 maps to SVG pixel y = -svgTop.
+    // Dome arc centre in screen px: (vw/2, CENTRE_TOP_PX).
+    // Dome radius in screen px: R.
+    var cx = vw / 2 * dpr;
+    var cy = CENTRE_TOP_PX * dpr;  // horizon centre in physical px
+    var cR = R * dpr;
+
+    // Pass 1: sparse uniform across full screen
+    for (var i = 0; i < 2000; i++) {
+      var px = rand() * W;
+      var py = rand() * H;
+      var r  = (0.4 + rand() * 0.6) * dpr;
+      var op = 0.06 + rand() * 0.18;
+      dot(px, py, r, op, 210, 225, 255);
+    }
+
+    // Pass 2: blob clusters — 16 centres, each 200 particles, tight sigma
+    for (var b = 0; b < 16; b++) {
+      var bx = cx + gauss() * cR * 0.7;
+      var by = cy - rand() * cR;  // above horizon (screen y < cy)
+      for (var j = 0; j < 200; j++) {
+        var px2 = bx + gauss() * cR * 0.08;
+        var py2 = by + gauss() * cR * 0.06;
+        if (px2 < 0 || py2 < 0 || px2 > W || py2 > H) continue;
+        var r2  = (0.4 + rand() * 0.7) * dpr;
+        var op2 = 0.15 + rand() * 0.35;
+        dot(px2, py2, r2, op2, 210, 225, 255);
+      }
+    }
+
+    // Pass 3: brighter accent dots
+    for (var k = 0; k < 600; k++) {
+      var px3 = rand() * W;
+      var py3 = rand() * H;
+      var r3  = (0.7 + rand() * 1.0) * dpr;
+      var op3 = 0.22 + rand() * 0.33;
+      dot(px3, py3, r3, op3, 230, 240, 255);
+    }
+
+    ctx.putImageData(img, 0, 0);
+  }
+
+  // Regenerating the field costs far more than fit() itself and resize fires
+  // continuously while a window edge is dragged. The first fit draws at once;
+  // later ones stretch the existing bitmap to the new viewport via CSS and
+  // redraw once resizing has settled. Same-size refits skip the redraw.
+  var STARFIELD_SETTLE_MS = 150;
+  var starfieldTimer = null;
+  var starfieldKey = '';
+  function updateStarfield(vw, vh, R, svgTop) {
+    var key = vw + 'x' + vh + '@' + (window.devicePixelRatio || 1);
+    if (!starfieldKey) {
+      starfieldKey = key;
+      drawStarfield(vw, vh, R, svgTop);
+      return;
+    }
+    if (starfieldTimer !== null) {
+      clearTimeout(starfieldTimer);
+      starfieldTimer = null;
+    }
+    sfCanvas.style.width  = vw + 'px';
+    sfCanvas.style.height = vh + 'px';
+    if (key === starfieldKey) return;  // back at the size already drawn
+    starfieldTimer = setTimeout(function() {
+      starfieldTimer = null;
+      starfieldKey = key;
+      drawStarfield(vw, vh, R, svgTop);
+    }, STARFIELD_SETTLE_MS);
+  }
+
+  // The <iframe> hosting this document: found by scanning the parent once, then
+  // reused until it stops pointing at this window.
+  var hostIframe = null;
+  function findHostIframe() {
+    if (hostIframe && hostIframe.contentWindow === window) return hostIframe;
+    hostIframe = null;
+    var frames = p.document.querySelectorAll('iframe');
+    for (var i = 0; i < frames.length; i++) {
+      if (frames[i].contentWindow === window) { hostIframe = frames[i]; break; }
+    }
+    return hostIframe;
+  }
+
+  function fit() {
+    var vw = p.innerWidth;
+    var vh = p.innerHeight;
+    // R: dome radius = 60% of viewport height
+    var R = Math.round(vh * 0.6);
+    var svgLeft = Math.round((vw - 2 * R) / 2);
+    var svgTop  = CENTRE_TOP_PX - R;
+    sky.style.width  = (2 * R) + 'px';
+    sky.style.height = R + 'px';
+    sky.style.left   = svgLeft + 'px';
+    sky.style.top    = svgTop  + 'px';
+    invCTM = null;  // SVG moved/resized: clientToSVG() re-reads its CTM
+    updateStarfield(vw, vh, R, svgTop);
+
+    // Sync iframe to full parent viewport
+    var iframe = findHostIframe();
+    if (iframe) {
+      iframe.style.width    = vw + 'px';
+      iframe.style.height   = vh + 'px';
+      iframe.style.position = 'fixed';
+      iframe.style.top      = '0';
+      iframe.style.left     = '0';
+      iframe.style.zIndex   = '0';
+      iframe.style.border   = 'none';
+    }
+    sky.style.visibility = 'visible';
+  }
+  requestAnimationFrame(function() {
+    requestAnimationFrame(function() {
+      fit();
+      // Watch parent DOM for tns-save-trigger marker injected by Streamlit
+      // when the save button is clicked. chart iframe has allow-same-origin
+      // so p.document is accessible.
+      try {
+        // tns-save-trigger is always in the DOM when sky_data exists.
+        // data-seq=0 means no save yet; seq>=1 means a save was requested.
+        // Strategy: watch for attribute changes on the trigger node (seq increments),
+        // and also handle the case where the node is added after iframe loads.
+        // Initialise _lastSeq from the current data-seq so a seq already in the
+        // DOM when this iframe loads is treated as "already handled".
+        // Only a seq that increments *after* this iframe loaded triggers capture.
+        var _initEl = p.document.getElementById('tns-save-trigger');
+        var _lastSeq = _initEl ? parseInt(_initEl.getAttribute('data-seq') || '0', 10) : 0;
+
+        function _checkTrigger() {
+          var el = p.document.getElementById('tns-save-trigger');
+          if (!el) return;
+          var seq = parseInt(el.getAttribute('data-seq') || '0', 10);
+          if (seq > _lastSeq) {
+            _lastSeq = seq;
+            _doCapture(null);
+          }
+        }
+
+        var mo = new MutationObserver(function(records) {
+          for (var ri = 0; ri < records.length; ri++) {
+            var r = records[ri];
+            // attribute change on the trigger node itself
+            if (r.type === 'attributes' && r.target.id === 'tns-save-trigger') {
+              _checkTrigger(); return;
+            }
+            // node added: trigger node newly inserted (e.g. first chart load)
+            var nodes = r.addedNodes;
+            for (var ni = 0; ni < nodes.length; ni++) {
+              var n = nodes[ni];
+              if ((n.id === 'tns-save-trigger') ||
+                  (n.querySelector && n.querySelector('#tns-save-trigger'))) {
+                if (moRoot === p.document.body) attachObserver();
+                _checkTrigger(); return;
+              }
+            }
+          }
+        });
+
+        // Observing the whole parent body would wake this callback for every
+        // Streamlit DOM update. Once the trigger exists, observe only its
+        // element container (still catching the node being re-rendered inside
+        // it); the body is the fallback while the trigger has not appeared.
+        // A slow check re-attaches if Streamlit remounts that container.
+        var moRoot = null;
+        var MO_OPTIONS = { childList: true, subtree: true, attributes: true, attributeFilter: ['data-seq'] };
+        function attachObserver() {
+          var el = p.document.getElementById('tns-save-trigger');
+          var root = el
+            ? (el.closest('[data-testid="stElementContainer"]') || el.parentNode)
+            : p.document.body;
+          if (root === moRoot) return;
+          mo.disconnect();
+          moRoot = root;
+          mo.observe(root, MO_OPTIONS);
+        }
+
+        var findFrames = 0;
+        (function waitForTrigger() {
+          // Bounded wait (~30 frames) for the trigger before settling for the body.
+          if (p.document.getElementById('tns-save-trigger') || ++findFrames >= 30) {
+            attachObserver();
+            setInterval(function() {
+              if (moRoot && moRoot.isConnected && moRoot !== p.document.body) return;
+              attachObserver();
+              _checkTrigger();
+            }, 1000);
+            return;
+          }
+          requestAnimationFrame(waitForTrigger);
+        })();
+      } catch(e) {}
+    });
+  });
+  // Resize fires many times per frame while dragging a window edge; coalesce
+  // into one fit() per animation frame.
+  var fitPending = false;
+  function scheduleFit() {
+    if (fitPending) return;
+    fitPending = true;
+    requestAnimationFrame(function() {
+      fitPending = false;
+      fit();
+    });
+  }
+  p.addEventListener('resize', scheduleFit);
+
+  // ── pan + zoom ───────────────────────────────────────────────
+  var svg = document.getElementById('sky');
+  var scene = document.getElementById('scene');
+  var rotating = document.getElementById('rotating');
+  var resetBtn = document.getElementById('reset-btn');
+
+  // transform state in SVG data-units
+  var tx = 0, ty = 0, scale = 1;
+
+  // Pan/zoom is applied as a CSS transform on the <g>: inside SVG, CSS px are user
+  // units, so 'translate(txpx,typx)' matches the attribute form in data-units, and
+  // the browser updates it without re-parsing a transform attribute each move.
+  // Falls back to the attribute where CSS transforms on SVG are unsupported.
+  var cssTransform = !!(window.CSS && CSS.supports && CSS.supports('transform', 'translate(1px,1px)'));
+  if (cssTransform) scene.style.transformOrigin = '0 0';
+
+  function sceneTransformAttr() {
+    return 'translate(' + tx + ',' + ty + ') scale(' + scale + ')';
+  }
+
+  // Input handlers update tx/ty/scale synchronously (later events build on them)
+  // but the DOM write is deferred to the next animation frame: mousemove/touchmove
+  // can fire several times per frame on high-rate devices, and only the last
+  // state of each frame is ever shown.
+  var transformPending = false;
+  function applyTransform() {
+    if (transformPending) return;
+    transformPending = true;
+    requestAnimationFrame(writeTransform);
+  }
+
+  function writeTransform() {
+    transformPending = false;
+    if (cssTransform) {
+      scene.style.transform = 'translate(' + tx + 'px,' + ty + 'px) scale(' + scale + ')';
+    } else {
+      scene.setAttribute('transform', sceneTransformAttr());
+    }
+    var changed = (tx !== 0 || ty !== 0 || scale !== 1);
+    resetBtn.style.display = changed ? 'block' : 'none';
+  }
+
+  // ── auto-rotation ────────────────────────────────────────────
+  // Rotate stars+lines around the horizon semicircle centre (SVG coords: cx=0, cy=1).
+  // One full rotation every 10 minutes (600 seconds).
+  //
+  // Where CSS transforms apply to SVG, the rotation is the CSS animation on
+  // #rotating.spin (see the page <style>): the browser drives it with no script
+  // per frame. Otherwise a requestAnimationFrame loop writes the transform
+  // attribute, at most every ROT_FRAME_MS (at 0.6°/s, 30 Hz looks like 60 Hz).
+  var DEG_PER_MS = 360 / (600 * 1000);
+  var ROT_FRAME_MS = 33;
+  var rotAngle = 0;
+  var lastTs = null;
+  var lastRotWrite = -Infinity;
+  var cssRotation = cssTransform;
+  if (cssRotation) rotating.classList.add('spin');
+
+  // Current angle in degrees: read back from the animated computed transform
+  // (matrix(a, b, ...) with a = cos θ, b = sin θ) or taken from the loop.
+  function currentRotation() {
+    if (!cssRotation) return rotAngle;
+    var m = getComputedStyle(rotating).transform;
+    if (!m || m === 'none') return 0;
+    var v = m.slice(m.indexOf('(') + 1, -1).split(',');
+    return Math.atan2(parseFloat(v[1]), parseFloat(v[0])) * 180 / Math.PI;
+  }
+
+  function rotationTransformAttr() {
+    return 'rotate(' + currentRotation() + ',0,1)';
+  }
+
+  // Rotation pauses while the tab is hidden or the chart is off-screen. The CSS
+  // animation is paused in place; the fallback loop stops scheduling frames and
+  // resets lastTs on resume so the sky picks up where it stopped.
+  var pageVisible = document.visibilityState !== 'hidden';
+  var onScreen = true;
+  var rotationRunning = false;
+
+  function rotationLoop(ts) {
+    if (!pageVisible || !onScreen) {
+      rotationRunning = false;
+      return;
+    }
+    if (lastTs !== null) {
+      rotAngle += (ts - lastTs) * DEG_PER_MS;
+      if (rotAngle >= 360) rotAngle -= 360;
+    }
+    lastTs = ts;
+    if (ts - lastRotWrite >= ROT_FRAME_MS) {
+      lastRotWrite = ts;
+      rotating.setAttribute('transform', rotationTransformAttr());
+    }
+    requestAnimationFrame(rotationLoop);
+  }
+
+  function resumeRotation() {
+    var run = pageVisible && onScreen;
+    if (cssRotation) {
+      rotating.classList.toggle('paused', !run);
+      return;
+    }
+    if (rotationRunning || !run) return;
+    rotationRunning = true;
+    lastTs = null;
+    requestAnimationFrame(rotationLoop);
+  }
+
+  document.addEventListener('visibilitychange', function() {
+    pageVisible = document.visibilityState !== 'hidden';
+    resumeRotation();
+  });
+  if (window.IntersectionObserver) {
+    new IntersectionObserver(function(entries) {
+      onScreen = entries[entries.length - 1].isIntersecting;
+      resumeRotation();
+    }).observe(sky);
+  }
+  resumeRotation();
+
+  // convert mouse/touch clientX/Y → SVG data-unit coords
+  // Uses the inverse CTM of the scene's parent (the svg element). That matrix
+  // only changes when fit() moves/resizes the SVG, so it is cached: fit() clears
+  // it and each new gesture re-reads it, instead of getScreenCTM() (which may
+  // force layout) plus inverse() on every move event.
+  var invCTM = null;
+  var clientPt = svg.createSVGPoint();
+
+  function refreshCTM() {
+    var ctm = svg.getScreenCTM();
+    invCTM = ctm ? ctm.inverse() : null;
+  }
+
+  function clientToSVG(clientX, clientY) {
+    if (!invCTM) refreshCTM();
+    if (!invCTM) return { x: 0, y: 0 };
+    clientPt.x = clientX;
+    clientPt.y = clientY;
+    return clientPt.matrixTransform(invCTM);
+  }
+
+  // ── mouse pan ────────────────────────────────────────────────
+  var dragging = false;
+  var dragStart = { x: 0, y: 0 };
+  var txAtDrag = 0, tyAtDrag = 0;
+
+  svg.addEventListener('mousedown', function(e) {
+    if (e.button !== 0) return;
+    refreshCTM();
+    dragging = true;
+    svg.classList.add('grabbing');
+    var svgPt = clientToSVG(e.clientX, e.clientY);
+    dragStart = svgPt;
+    txAtDrag = tx;
+    tyAtDrag = ty;
+    e.preventDefault();
+  });
+
+  window.addEventListener('mousemove', function(e) {
+    if (!dragging) return;
+    var svgPt = clientToSVG(e.clientX, e.clientY);
+    tx = txAtDrag + (svgPt.x - dragStart.x);
+    ty = tyAtDrag + (svgPt.y - dragStart.y);
+    applyTransform();
+  });
+
+  window.addEventListener('mouseup', function() {
+    dragging = false;
+    svg.classList.remove('grabbing');
+  });
+
+  // ── wheel zoom ───────────────────────────────────────────────
+  svg.addEventListener('wheel', function(e) {
+    e.preventDefault();
+    // deltaY varies wildly by device/mode (1 line ≈ 3–40px, 1 page ≈ 800px).
+    // Normalise to a fixed step per notch so trackpad doesn't feel 10× faster.
+    var delta = e.deltaY;
+    if (e.deltaMode === 0) { delta = delta / 120; }  // pixel mode → notch units
+    else if (e.deltaMode === 2) { delta = delta * 3; } // page mode → notch units
+    // clamp per-event step to ±3 notches to prevent runaway acceleration
+    delta = Math.max(-3, Math.min(3, delta));
+    var factor = Math.pow(1.06, -delta);
+    var pivot = clientToSVG(e.clientX, e.clientY);
+    // zoom toward pivot: translate so pivot stays fixed
+    tx = pivot.x + (tx - pivot.x) * factor;
+    ty = pivot.y + (ty - pivot.y) * factor;
+    scale *= factor;
+    // clamp zoom
+    if (scale < 0.25) { var r = 0.25 / scale; scale = 0.25; tx *= r; ty *= r; }
+    if (scale > 8)    { var r = 8 / scale;    scale = 8;    tx *= r; ty *= r; }
+    applyTransform();
+  }, { passive: false });
+
+  // ── touch pan + pinch ────────────────────────────────────────
+  // Only the first two fingers drive pan/pinch, so they live in two fixed
+  // slots plus an active-touch counter: touchmove does no Map/iterator or
+  // Object.keys() allocation per frame.
+  var touch0 = null, touch1 = null;
+  var nTouches = 0;
+  var pinchDist0 = null;
+  var scaleAtPinch = 1;
+  var txAtPinch = 0, tyAtPinch = 0;
+  var midAtPinch = null;
+
+  function touchDist(t1, t2) {
+    var dx = t1.clientX - t2.clientX;
+    var dy = t1.clientY - t2.clientY;
+    return Math.sqrt(dx*dx + dy*dy);
+  }
+
+  function beginDrag(t) {
+    dragging = true;
+    dragStart = clientToSVG(t.clientX, t.clientY);
+    txAtDrag = tx;
+    tyAtDrag = ty;
+  }
+
+  function beginPinch() {
+    dragging = false;
+    pinchDist0 = touchDist(touch0, touch1);
+    scaleAtPinch = scale;
+    txAtPinch = tx;
+    tyAtPinch = ty;
+    midAtPinch = clientToSVG(
+      (touch0.clientX + touch1.clientX) / 2,
+      (touch0.clientY + touch1.clientY) / 2
+    );
+  }
+
+  svg.addEventListener('touchstart', function(e) {
+    e.preventDefault();
+    refreshCTM();
+    // targetTouches: fingers on the chart only (its children take no pointer
+    // events), so fingers elsewhere on the page are never counted or tracked.
+    nTouches = e.targetTouches.length;
+    for (var i = 0; i < e.changedTouches.length; i++) {
+      var t = e.changedTouches[i];
+      if (touch0 === null) touch0 = t;
+      else if (touch1 === null) touch1 = t;
+    }
+    if (nTouches === 1) {
+      beginDrag(touch0);
+    } else if (nTouches === 2 && touch1 !== null) {
+      beginPinch();
+    }
+  }, { passive: false });
+
+  svg.addEventListener('touchmove', function(e) {
+    e.preventDefault();
+    for (var i = 0; i < e.changedTouches.length; i++) {
+      var t = e.changedTouches[i];
+      if (touch0 !== null && t.identifier === touch0.identifier) touch0 = t;
+      else if (touch1 !== null && t.identifier === touch1.identifier) touch1 = t;
+    }
+    if (nTouches === 1 && dragging) {
+      var svgPt = clientToSVG(touch0.clientX, touch0.clientY);
+      tx = txAtDrag + (svgPt.x - dragStart.x);
+      ty = tyAtDrag + (svgPt.y - dragStart.y);
+      applyTransform();
+    } else if (touch0 !== null && touch1 !== null && pinchDist0 !== null) {
+      var dist = touchDist(touch0, touch1);
+      var factor = dist / pinchDist0;
+      scale = scaleAtPinch * factor;
+      if (scale < 0.25) scale = 0.25;
+      if (scale > 8)    scale = 8;
+      // keep pinch midpoint fixed
+      tx = midAtPinch.x * (1 - scale) + txAtPinch * (scale / scaleAtPinch);
+      ty = midAtPinch.y * (1 - scale) + tyAtPinch * (scale / scaleAtPinch);
+      applyTransform();
+    } else {
+      pinchDist0 = null;
+    }
+  }, { passive: false });
+
+  function endTouches(e) {
+    var emptied = false;
+    for (var i = 0; i < e.changedTouches.length; i++) {
+      var id = e.changedTouches[i].identifier;
+      if (touch0 !== null && id === touch0.identifier) {
+        touch0 = touch1;
+        touch1 = null;
+        emptied = true;
+      } else if (touch1 !== null && id === touch1.identifier) {
+        touch1 = null;
+        emptied = true;
+      }
+    }
+    // e.targetTouches holds the fingers still down on the chart. If a tracked
+    // finger lifted while others remain (e.g. the first of three), promote them
+    // into the free slots so a two-finger gesture never runs on a half-empty
+    // pair.
+    nTouches = e.targetTouches.length;
+    if (emptied) {
+      for (var j = 0; j < e.targetTouches.length && touch1 === null; j++) {
+        var rest = e.targetTouches[j];
+        if (touch0 === null) touch0 = rest;
+        else if (rest.identifier !== touch0.identifier) touch1 = rest;
+      }
+    }
+    if (nTouches < 2) {
+      pinchDist0 = null;
+    } else if (emptied && touch1 !== null) {
+      // New pair: re-seed so the zoom continues from the current scale.
+      beginPinch();
+    }
+    if (nTouches === 1 && touch0 !== null) {
+      beginDrag(touch0);
+    } else if (nTouches === 0) {
+      touch0 = touch1 = null;
+      dragging = false;
+    }
+  }
+
+  svg.addEventListener('touchend', endTouches, { passive: false });
+  svg.addEventListener('touchcancel', endTouches, { passive: false });
+
+  // ── reset ────────────────────────────────────────────────────
+  resetBtn.addEventListener('click', function() {
+    tx = 0; ty = 0; scale = 1;
+    applyTransform();
+  });
+
+  // ── save button ──────────────────────────────────────────────
+  var saveBtn = document.getElementById('save-btn');
+  saveBtn.addEventListener('click', function() {
+    saveBtn.disabled = true;
+    _doCapture(function() { saveBtn.disabled = false; });
+  });
+
+  // ── PNG capture ──────────────────────────────────────────────
+  // Strategy: SVG data URI → <img> → Canvas drawImage (no external deps)
+  //
+  // html2canvas: Edge renders position:fixed SVG as blank.
+  // SVG Blob URL: fragment IDs (url(#sg0)) lose document context in Blob origin
+  //   → radialGradient lookup fails → stars are transparent.
+  // data URI: fragment IDs resolve within the inline SVG <defs> → gradients work.
+  //
+  // SVG position: top = CENTRE_TOP_PX - R, typically negative.
+  // Use 9-arg drawImage to crop only the on-screen slice from the SVG image,
+  // avoiding the off-screen negative-top portion that causes canvas clipping.
+  //
+  // Composite: background fill → starfield canvas → SVG crop → narrative text.
+  var _NARRATIVE = CFG.narrative;
+
+  // The chart markup never changes after load; between saves only the root
+  // size/viewBox/style and the #scene/#rotating transforms differ. The SVG is
+  // serialized once with placeholder tokens in those attributes and split into
+  // parts, so each later save is a string join instead of a DOM walk.
+  var SVG_TOKEN_RE = /(@@tns-[a-z]+@@)/;
+  var _svgParts = null;
+
+  function _escAttr(v) {
+    return String(v).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/"/g, '&quot;');
+  }
+
+  function _serializeSky(values) {
+    if (!_svgParts) {
+      var tpl = sky.cloneNode(true);
+      tpl.setAttribute('width', '@@tns-width@@');
+      tpl.setAttribute('height', '@@tns-height@@');
+      tpl.setAttribute('viewBox', '@@tns-viewbox@@');
+      tpl.setAttribute('style', '@@tns-style@@');
+      // Live rotation and pan/zoom may be CSS (an animation / inline styles); the
+      // serialized copy carries them as transform attributes, which survive
+      // data-URI rasterisation.
+      var tplRot = tpl.querySelector('#rotating');
+      tplRot.removeAttribute('style');
+      tplRot.removeAttribute('class');
+      tplRot.setAttribute('transform', '@@tns-rotating@@');
+      var tplScene = tpl.querySelector('#scene');
+      tplScene.removeAttribute('style');
+      tplScene.setAttribute('transform', '@@tns-scene@@');
+      _svgParts = new XMLSerializer().serializeToString(tpl).split(SVG_TOKEN_RE);
+    }
+    // split() with a capture group puts the tokens at the odd indices.
+    var out = _svgParts.slice();
+    for (var i = 1; i < out.length; i += 2) out[i] = _escAttr(values[out[i]]);
+    return out.join('');
+  }
+
+  // btoa handles only single-byte chars. Encode to UTF-8 bytes once, then feed
+  // btoa 24 KB slices (a multiple of 3 bytes, so the slices' base64 concatenates
+  // cleanly; small enough for String.fromCharCode.apply's argument limit).
+  function _utf8ToBase64(str) {
+    if (typeof TextEncoder === 'undefined') return btoa(unescape(encodeURIComponent(str)));
+    var bytes = new TextEncoder().encode(str);
+    var CHUNK = 0x6000;
+    var out = [];
+    for (var i = 0; i < bytes.length; i += CHUNK) {
+      out.push(btoa(String.fromCharCode.apply(null, bytes.subarray(i, i + CHUNK))));
+    }
+    return out.join('');
+  }
+
+  // Composite on an OffscreenCanvas when its 2D context is available: it is
+  // detached from layout, and convertToBlob() encodes asynchronously. Falls
+  // back to a detached <canvas> (some Safari versions lack a 2D context).
+  function _makeOutputCanvas(w, h) {
+    if (typeof OffscreenCanvas !== 'undefined') {
+      try {
+        var oc = new OffscreenCanvas(w, h);
+        if (oc.getContext('2d')) return oc;
+      } catch(e) {}
+    }
+    var c = document.createElement('canvas');
+    c.width  = w;
+    c.height = h;
+    return c;
+  }
+
+  // Encode the composite as PNG and hand back a URL for the download link:
+  // a Blob object URL where possible (no multi-megabyte base64 data URI),
+  // else toDataURL. cb(href, isObjectUrl); href is null on failure.
+  function _encodePng(canvas, cb) {
+    function fromBlob(b) {
+      if (b) cb(URL.createObjectURL(b), true);
+      else if (canvas.toDataURL) cb(canvas.toDataURL('image/png'), false);
+      else cb(null, false);
+    }
+    if (canvas.convertToBlob) {
+      canvas.convertToBlob({ type: 'image/png' }).then(fromBlob, function() { cb(null, false); });
+    } else if (canvas.toBlob) {
+      canvas.toBlob(fromBlob, 'image/png');
+    } else {
+      cb(canvas.toDataURL('image/png'), false);
+    }
+  }
+
+  function _doCapture(onDone) {
+    var vp = window.parent || window;
+    var pw = vp.innerWidth;
+    var ph = vp.innerHeight;
+    var dpr = window.devicePixelRatio || 1;
+
+    // SVG geometry as set by fit() (CSS pixels)
+    var svgW    = parseFloat(sky.style.width)  || pw;
+    var svgH    = parseFloat(sky.style.height) || (pw / 2);
+    var svgLeft = parseFloat(sky.style.left)   || 0;
+    var svgTop  = parseFloat(sky.style.top)    || 0;  // typically negative
+
+    // Output canvas: full viewport in physical pixels
+    var out = _makeOutputCanvas(Math.round(pw * dpr), Math.round(ph * dpr));
+    var ctx = out.getContext('2d');
+
+    // Step 1: background + starfield canvas
+    ctx.fillStyle = CFG.bg;
+    ctx.fillRect(0, 0, out.width, out.height);
+    try {
+      if (sfCanvas && sfCanvas.width > 0) {
+        ctx.drawImage(sfCanvas, 0, 0, out.width, out.height);
+      }
+    } catch(e) {}
+
+    // Step 2: serialize live SVG into data URI, snapshotting current transforms.
+    //
+    // The SVG element has:  top = svgTop (negative), height = R.
+    // overflow="visible" means the horizon arc stroke (at y=1 in data-units, the
+    // very bottom of the viewBox) extends slightly below the SVG's pixel boundary.
+    // When the browser rasterises a <img> from an SVG data URI it clips to the
+    // declared pixel height — so we must give the clone extra height to prevent
+    // the stroke from being cut off.
+    //
+    // Strategy: extend viewBox height (y stays at 0) so overflow="visible" horizon
+    // stroke is included in the rasterised image, while keeping the 1 data-unit = R px
+    // scale intact (width/height change together with the same pixel:data ratio).
+    //
+    // Original: width=2R, height=R, viewBox="-1 0 2 1"  → 1 data-unit = R px
+    // Extended: width=2R, height=extH, viewBox="-1 0 2 vbH"
+    //   vbH = extH / R  → still 1 data-unit = R px, so content positions unchanged.
+    //   y=1 (horizon) still maps to pixel y=R; overflow stroke lands in y=R…extH.
+    //
+    // extH = ph - svgTop  (svgTop < 0, so extH > ph; the image covers svgTop…ph)
+    // drawImage source:
+    //   sx = 0 (svgLeft >= 0, no horizontal off-screen; centred dome fits in viewport)
+    //   sy = -svgTop  (skip the above-screen portion; image top = screen y=svgTop)
+    //   sw = pw, sh = ph  (paint exactly the full viewport)
+    //   dx=0, dy=0, dw=pw*dpr, dh=ph*dpr
+    var R    = svgH;                  // svgH = R from fit()
+    var extH = ph - svgTop;           // svgTop <= 0 → extH >= ph
+    var vbH  = extH / R;              // viewBox height in data-units
+
+    var svgStr = _serializeSky({
+      '@@tns-width@@': svgW,              // keep original pixel width (= 2R)
+      '@@tns-height@@': extH,
+      '@@tns-viewbox@@': '-1 0 2 ' + vbH.toFixed(6),
+      '@@tns-style@@': sky.getAttribute('style') || '',
+      '@@tns-rotating@@': rotationTransformAttr(),
+      '@@tns-scene@@': sceneTransformAttr()
+    });
+    var dataUri = 'data:image/svg+xml;base64,' + _utf8ToBase64(svgStr);
+
+    // Step 3: ensure the custom font is loaded in this canvas context before drawing.
+    // Canvas 2D does not inherit @font-face from CSS unless the font is already loaded.
+    var _fontSpec = 'italic 16px "NostalgicPoliceHumanRights"';
+    var _fontUrl  = 'https://cdn.jsdelivr.net/gh/projectnoonnu/2601-6@1.0/Griun_PolHumanrights-Rg.woff2';
+    function _drawWithFont(drawFn) {
+      if (!_NARRATIVE) { drawFn(); return; }
+      // FontFace API available in all modern browsers
+      if (typeof FontFace !== 'undefined' && document.fonts) {
+        var ff = new FontFace('NostalgicPoliceHumanRights', 'url(' + _fontUrl + ')', { style: 'italic' });
+        ff.load().then(function(loaded) {
+          document.fonts.add(loaded);
+          drawFn();
+        }).catch(function() { drawFn(); });
+      } else {
+        drawFn();
+      }
+    }
+
+    var img = new Image();
+    img.onload = function() {
+      // 9-arg drawImage.
+      // Image size: svgW × extH.  Image top-left is at screen (svgLeft, svgTop).
+      // svgTop < 0: image extends above screen top; sy=-svgTop skips that portion.
+      // svgLeft < 0: dome wider than viewport; sx=-svgLeft skips off-screen left portion.
+      // svgLeft > 0: dome narrower than viewport; dx=svgLeft*dpr offsets onto canvas.
+      var sx = svgLeft < 0 ? -svgLeft : 0;
+      var sy = -svgTop;
+      var sw = Math.min(svgW - sx, pw - (svgLeft > 0 ? svgLeft : 0));
+      var sh = ph;
+      var dx = svgLeft > 0 ? Math.round(svgLeft * dpr) : 0;
+      var dy = 0;
+      var dw = sw * dpr;
+      var dh = ph * dpr;
+
+      if (sw > 0 && sh > 0) {
+        ctx.drawImage(img, sx, sy, sw, sh, dx, dy, dw, dh);
+      }
+
+      _drawWithFont(function() {
+        // Step 4: narrative overlay at bottom
+        if (_NARRATIVE) {
+          var padY     = Math.round(24 * dpr);
+          var fontSize = Math.round(16 * dpr);
+          var lineH    = Math.round(fontSize * 1.75);
+          var maxW     = Math.min(Math.round(pw * dpr * 0.85), Math.round(640 * dpr));
+          var font     = 'italic ' + fontSize + 'px "NostalgicPoliceHumanRights","Apple SD Gothic Neo","Malgun Gothic",sans-serif';
+          ctx.font = font;
+
+          // Greedy wrap on running widths: each token (and the space) is
+          // measured once, rather than re-measuring the growing line per token.
+          var tokens = _NARRATIVE.split(/\s+/);
+          var spaceW = ctx.measureText(' ').width;
+          var lines = [], cur = '', curW = 0;
+          for (var ti = 0; ti < tokens.length; ti++) {
+            var tok = tokens[ti];
+            if (!tok) continue;
+            var tokW = ctx.measureText(tok).width;
+            if (cur && curW + spaceW + tokW > maxW) {
+              lines.push(cur); cur = tok; curW = tokW;
+            } else if (cur) {
+              cur += ' ' + tok; curW += spaceW + tokW;
+            } else {
+              cur = tok; curW = tokW;
+            }
+          }
+          if (cur) lines.push(cur);
+
+          var boxH = lines.length * lineH + padY * 2;
+          var boxY = out.height - boxH;
+          ctx.fillStyle = 'rgba(10,20,42,0.82)';
+          ctx.fillRect(0, boxY, out.width, boxH);
+          ctx.fillStyle = 'rgba(201,169,110,0.4)';
+          ctx.fillRect(0, boxY, out.width, Math.round(dpr));
+          ctx.font = font;
+          ctx.fillStyle = '#e8d5a3';
+          ctx.textAlign = 'center';
+          ctx.textBaseline = 'top';
+          var ty2 = boxY + padY;
+          for (var li = 0; li < lines.length; li++) {
+            ctx.fillText(lines[li], Math.round(out.width / 2), ty2);
+            ty2 += lineH;
+          }
+        }
+
+        // Step 5: trigger download
+        _encodePng(out, function(href, isObjectUrl) {
+          if (href) {
+            var a = document.createElement('a');
+            a.href = href;
+            a.download = CFG.filename;
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
+            // The download has started from the click; release the blob later.
+            if (isObjectUrl) setTimeout(function() { URL.revokeObjectURL(href); }, 10000);
+          }
+          if (onDone) onDone();
+        });
+      });
+    };
+    img.onerror = function() {
+      if (onDone) onDone();
+    };
+    img.src = dataUri;
+  }
+
+  window.addEventListener('message', function(e) {
+    if (!e.data || e.data.type !== 'tns_save') return;
+    _doCapture(null);
+  });
+})();
@@ -12,6 +12,15 @@ Coordinate system (matches plotly_2d.py):
 
 from __future__ import annotations
 
+import base64
+import gzip
+import json
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+
+import numpy as np
+
 from thatnightsky.i18n import t
 from thatnightsky.models import SkyData
 
@@ -20,25 +29,85 @@ _STAR_COLOR = "#f0e0b0"
 _LINE_COLOR = "#c9a96e"
 _HORIZON_COLOR = "#c9a96e"
 
-
-def _star_radius(magnitude: float) -> float:
-    """Map Hipparcos magnitude to SVG circle radius in data-units."""
+# Per-element fragments are printf-style templates applied to plain tuples:
+# `%` with a tuple is measurably cheaper per element than an f-string with
+# format specs. Stroke/fill shared by all elements lives on the wrapping <g>.
+# All constellation segments share one <path> as "M x0,y0 L x1,y1" subpaths.
+# Geometry is emitted as integer milli-units (1/1000 data unit) inside a
+# scale(0.001) group — the same precision as 3 decimals (0.0005 is under half a
+# pixel even on a 4K-wide chart), but %d formats several times faster than
+# %.3f and drops the "0." from every number.
+_MILLI = 1000
+_LINE_SEG_TMPL = "M%d,%dL%d,%d"
+_LINE_PATH_TMPL = '<path fill="none" d="%s"/>'
+# Glows are grouped per gradient level under <g fill="url(#sgN)">. They stay
+# separate circles: objectBoundingBox gradients on one merged path would stretch
+# across the whole path instead of centring on each star.
+_GLOW_TMPL = '<circle cx="%d" cy="%d" r="%d"/>'
+_GLOW_GROUP_TMPL = '<g fill="url(#sg%d)">%s</g>'
+# Star cores sharing a glow level are merged into one <path>, each core a closed
+# pair of half-circle arcs starting at its left edge: (x - r, y, r, r, 2r, r, r, 2r).
+_CORE_ARC_TMPL = "M%d,%da%d,%d 0 1,0 %d,0a%d,%d 0 1,0 -%d,0"
+_CORE_PATH_TMPL = '<path opacity="%s" d="%s"/>'
+
+# 10 shared radialGradient levels keyed by opacity bucket — avoids one gradient
+# per star which would bloat the HTML and break iframe rendering. They depend on
+# nothing per-render, so the <defs> markup is built once at import.
+_N_GLOW_LEVELS = 10
+_LEVEL_OPACITY = tuple(
+    0.35 + lvl * (0.65 / (_N_GLOW_LEVELS - 1)) for lvl in range(_N_GLOW_LEVELS)
+)
+# Core path opacity attribute text per level.
+_LEVEL_OPACITY_ATTR = tuple(f"{op:.2f}" for op in _LEVEL_OPACITY)
+_DEFS_SVG = "\n    ".join(
+    f'<radialGradient id="sg{lvl}" cx="50%" cy="50%" r="50%">'
+    f'<stop offset="0%" stop-color="{_STAR_COLOR}" stop-opacity="{op_lvl * 0.55:.2f}"/>'
+    f'<stop offset="40%" stop-color="{_STAR_COLOR}" stop-opacity="{op_lvl * 0.18:.2f}"/>'
+    f'<stop offset="100%" stop-color="{_STAR_COLOR}" stop-opacity="0"/>'
+    f"</radialGradient>"
+    for lvl, op_lvl in enumerate(_LEVEL_OPACITY)
+)
+
+
+def _star_radius(magnitude: np.ndarray) -> np.ndarray:
+    """Map Hipparcos magnitudes to SVG circle radii in data-units."""
     # viewBox width=2, so radius 0.01 ≈ 1% of chart width.
     # Wider dynamic range than before: bright stars (mag<2) are notably larger.
-    r = (6 - magnitude) / 600
-    return max(0.0018, min(r, 0.018))
+    return np.clip((6 - magnitude) / 600, 0.0018, 0.018)
 
 
-def _star_opacity(magnitude: float) -> float:
+def _star_opacity(magnitude: np.ndarray) -> np.ndarray:
     """Dimmer stars are more transparent, reinforcing magnitude difference."""
-    return max(0.35, min(1.0, (6 - magnitude) / 6))
+    return np.clip((6 - magnitude) / 6, 0.35, 1.0)
+
+
+def _ascii_html(text: str) -> str:
+    """Return HTML text content with non-ASCII characters as numeric references."""
+    return text.encode("ascii", "xmlcharrefreplace").decode("ascii")
 
 
+def _milli(values: np.ndarray) -> np.ndarray:
+    """Round data-unit values to the integer milli-units the SVG markup uses."""
+    return np.rint(values * _MILLI).astype(np.int64)
+
+
+def _format_rows(template: str, rows: np.ndarray) -> str:
+    """Apply a printf-style fragment template to every row of a 2-D array.
+
+    The template is repeated once per row and filled by a single `%` over the
+    flattened values, so the whole batch is formatted in one C-level call
+    instead of one Python-level `%` per element.
+    """
+    return (template * len(rows)) % tuple(rows.ravel().tolist())
+
+
+@lru_cache(maxsize=8)
 def render_svg_html(
     sky_data: SkyData,
     filename: str = "that-night-sky.png",
     narrative: str = "",
     lang: str = "en",
+    max_magnitude: float | None = None,
 ) -> str:
     """Return a self-contained HTML page with an SVG star chart.
 
@@ -50,120 +119,213 @@ def render_svg_html(
     When `narrative` is set, it is embedded as a JS string and drawn
     as wrapped text at the bottom of the captured PNG on `tns_save`.
 
+    Output depends only on the arguments, so results are memoized: Streamlit
+    reruns with the same SkyData and narrative return the cached string.
+
     Args:
         sky_data: Fully computed celestial data.
         filename: Suggested filename for the downloaded PNG.
         narrative: Optional narrative text to draw on PNG.
         lang: Language code ('ko' or 'en') for button labels.
+        max_magnitude: Optional extra magnitude cutoff applied on top of
+            SkyData.limiting_magnitude; fainter stars (and lines touching them)
+            are not emitted. None keeps every star in sky_data.
 
     Returns:
         HTML string suitable for st.components.v1.html().
     """
-    visible = [s for s in sky_data.stars if s.alt_deg >= 0]
+    stars = sky_data.star_arrays
+    mask = stars.alt_deg >= 0
+    if max_magnitude is not None:
+        mask &= stars.magnitude <= max_magnitude
+    visible = stars.select(mask)
+
+    # SVG y-axis is top-down; data y=0 → SVG bottom, y=1 → SVG top
+    # viewBox="-1 0 2 1": SVG y=0 is top, SVG y=1 is bottom
+    # → flip: svg_y = 1 - data_y
+    # Positions and radii are rounded to milli-units once, up front.
+    mx = _milli(visible.x)
+    my = _milli(1 - visible.y)
 
     # --- Constellation lines ---
-    hip_to_xy: dict[int, tuple[float, float]] = {s.hip: (s.x, s.y) for s in visible}
-    line_parts: list[str] = []
-    for line in sky_data.constellation_lines:
-        if line.hip_from in hip_to_xy and line.hip_to in hip_to_xy:
-            x0, y0 = hip_to_xy[line.hip_from]
-            x1, y1 = hip_to_xy[line.hip_to]
-            # SVG y-axis is top-down; data y=0 → SVG bottom, y=1 → SVG top
-            # viewBox="-1 0 2 1": SVG y=0 is top, SVG y=1 is bottom
-            # → flip: svg_y = 1 - data_y
-            sy0 = 1 - y0
-            sy1 = 1 - y1
-            line_parts.append(
-                f'<line x1="{x0:.4f}" y1="{sy0:.4f}" x2="{x1:.4f}" y2="{sy1:.4f}"'
-                f' stroke="{_LINE_COLOR}" stroke-width="0.0025" stroke-opacity="0.55"/>'
+    # segment_indices() returns early when there are no lines or no visible stars;
+    # with nothing to draw the (empty) <path> element is omitted entirely.
+    lines_svg = ""
+    seg = visible.segment_indices(sky_data.line_hips)
+    if seg.size:
+        x0, y0, x1, y1 = mx[seg[:, 0]], my[seg[:, 0]], mx[seg[:, 1]], my[seg[:, 1]]
+        # Drop segments whose endpoints coincide at the emitted precision — they
+        # would draw nothing.
+        drawn = (x0 != x1) | (y0 != y1)
+        if drawn.any():
+            # A single <path> for every segment: one DOM node instead of one
+            # <line> each.
+            lines_svg = _LINE_PATH_TMPL % _format_rows(
+                _LINE_SEG_TMPL, np.column_stack((x0, y0, x1, y1))[drawn]
             )
 
     # --- Stars ---
-    # 10 shared radialGradient levels keyed by opacity bucket — avoids one gradient
-    # per star which would bloat the HTML and break iframe rendering.
-    _N_GLOW_LEVELS = 10
-    grad_defs: list[str] = []
-    for lvl in range(_N_GLOW_LEVELS):
-        op_lvl = 0.35 + lvl * (0.65 / (_N_GLOW_LEVELS - 1))
-        grad_defs.append(
-            f'<radialGradient id="sg{lvl}" cx="50%" cy="50%" r="50%">'
-            f'<stop offset="0%" stop-color="{_STAR_COLOR}" stop-opacity="{op_lvl * 0.55:.2f}"/>'
-            f'<stop offset="40%" stop-color="{_STAR_COLOR}" stop-opacity="{op_lvl * 0.18:.2f}"/>'
-            f'<stop offset="100%" stop-color="{_STAR_COLOR}" stop-opacity="0"/>'
-            f"</radialGradient>"
+    # Glows and cores go into separate groups so the shared core fill is set once
+    # on the group; every glow sits beneath every core.
+    radii = _star_radius(visible.magnitude)
+    mr = _milli(radii)
+    glow_mr = _milli(radii * 4.5)
+    opacity = _star_opacity(visible.magnitude)
+    # np.rint rounds half to even, like the built-in round() it replaces.
+    lvls = np.clip(
+        np.rint((opacity - 0.35) / 0.65 * (_N_GLOW_LEVELS - 1)), 0, _N_GLOW_LEVELS - 1
+    ).astype(np.int64)
+    levels = np.unique(lvls).tolist()
+    glow_cols = np.column_stack((mx, my, glow_mr))
+    glow_parts = [
+        _GLOW_GROUP_TMPL % (lvl, _format_rows(_GLOW_TMPL, glow_cols[lvls == lvl]))
+        for lvl in levels
+    ]
+
+    # One <path> per glow level instead of one <circle> per star: cores reuse
+    # the glow bucketing and take their level's opacity, so the whole sky is at
+    # most _N_GLOW_LEVELS core nodes. Levels ascend with brightness, so brighter
+    # cores paint last.
+    md = mr * 2
+    core_cols = np.column_stack((mx - mr, my, mr, mr, md, mr, mr, md))
+    core_parts = [
+        _CORE_PATH_TMPL
+        % (
+            _LEVEL_OPACITY_ATTR[lvl],
+            _format_rows(_CORE_ARC_TMPL, core_cols[lvls == lvl]),
         )
-
-    star_parts: list[str] = []
-    for s in visible:
-        r = _star_radius(s.magnitude)
-        op = _star_opacity(s.magnitude)
-        sy = 1 - s.y
-        glow_r = r * 4.5
-        lvl = round((op - 0.35) / 0.65 * (_N_GLOW_LEVELS - 1))
-        lvl = max(0, min(_N_GLOW_LEVELS - 1, lvl))
-        star_parts.append(
-            f'<circle cx="{s.x:.4f}" cy="{sy:.4f}" r="{glow_r:.4f}"'
-            f' fill="url(#sg{lvl})"/>'
-        )
-        star_parts.append(
-            f'<circle cx="{s.x:.4f}" cy="{sy:.4f}" r="{r:.4f}"'
-            f' fill="{_STAR_COLOR}" opacity="{op:.2f}"/>'
+        for lvl in levels
+    ]
+
+    # Thousands of star fragments: join without the cosmetic newline+indent.
+    glow_svg = "".join(glow_parts)
+    core_svg = "".join(core_parts)
+
+    # Per-render values for svg_2d.js. json.dumps escapes quotes, backslashes and
+    # newlines (and non-ASCII, as \uXXXX); "</" is additionally escaped so the
+    # text cannot close the <script>.
+    config_json = json.dumps(
+        {"bg": _BG, "narrative": narrative or None, "filename": filename}
+    ).replace("</", "<\\/")
+
+    # Static page text is interleaved with the per-render fragments in template
+    # order; one join builds the page without re-scanning the template. Every
+    # piece is ASCII, so the ~400 KB page stays a 1-byte-per-char str and
+    # .encode() at the boundary is a plain copy — one Korean label or narrative
+    # character would otherwise widen the whole page to 2 bytes per char.
+    p = _HTML_PARTS
+    return "".join(
+        (
+            p[0],
+            lines_svg,
+            p[1],
+            glow_svg,
+            p[2],
+            core_svg,
+            p[3],
+            _ascii_html(t("svg_btn_reset", lang)),
+            p[4],
+            _ascii_html(t("svg_btn_save", lang)),
+            p[5],
+            config_json,
+            p[6],
         )
+    )
+
+
+@lru_cache(maxsize=8)
+def render_svg_html_compressed(
+    sky_data: SkyData,
+    filename: str = "that-night-sky.png",
+    narrative: str = "",
+    lang: str = "en",
+    max_magnitude: float | None = None,
+) -> str:
+    """Return render_svg_html() output gzipped inside a small inflating shim.
+
+    The chart page is mostly repetitive SVG markup and compresses several-fold,
+    so the shim (base64 gzip + a DecompressionStream loader that document.write()s
+    the inflated page) is a fraction of the plain page's size on the websocket.
+    Requires DecompressionStream in the browser (Chrome 80+, Safari 16.4+,
+    Firefox 113+); older browsers get a visible notice instead of a blank frame.
+
+    Args:
+        sky_data: Fully computed celestial data.
+        filename: Suggested filename for the downloaded PNG.
+        narrative: Optional narrative text to draw on PNG.
+        lang: Language code ('ko' or 'en') for button labels.
+        max_magnitude: Optional extra magnitude cutoff; see render_svg_html().
 
-    # --- Horizon circle ---
-    # Full circle centred at (0,1) with radius 1.
-    # viewBox="-1 0 2 1": only the upper half is visible (y<1); lower half is clipped.
-    # SVG y-axis is top-down, so y=1 is the bottom edge of the viewBox.
-    # Two strokes: outer glow (wide, low opacity) + sharp inner line.
-    horizon_path = "M -1,1 A 1,1 0 1 1 1,1 A 1,1 0 1 1 -1,1 Z"
-
-    lines_svg = "\n    ".join(line_parts)
-    defs_svg = "\n    ".join(grad_defs)
-    stars_svg = "\n    ".join(star_parts)
-
-    # Escape narrative for safe embedding as a JS string literal.
-    narrative_js = (
-        "null"
-        if not narrative
-        else '"'
-        + narrative.replace("\\", "\\\\")
-        .replace('"', '\\"')
-        .replace("\n", "\\n")
-        .replace("\r", "")
-        + '"'
+    Returns:
+        HTML string suitable for st.components.v1.html().
+    """
+    page = render_svg_html(sky_data, filename, narrative, lang, max_magnitude)
+    payload = base64.b64encode(gzip.compress(page.encode("utf-8"), compresslevel=6))
+    return _GZIP_SHIM_TEMPLATE % (
+        _BG,
+        _STAR_COLOR,
+        _ascii_html(t("svg_unsupported_browser", lang)),
+        payload.decode("ascii"),
     )
 
-    return f"""<!DOCTYPE html>
+
+# Chart interactivity (fit, starfield, rotation, pan/zoom, PNG capture). Kept as a
+# plain .js file so it needs no brace escaping; read once at import. Its only
+# non-ASCII characters are in comments, where \uXXXX escapes are inert; this
+# keeps the page pure ASCII (see render_svg_html).
+_SCRIPT = (
+    Path(__file__)
+    .with_name("svg_2d.js")
+    .read_text(encoding="utf-8")
+    .encode("ascii", "backslashreplace")
+    .decode("ascii")
+)
+
+# --- Horizon circle ---
+# Full circle centred at (0,1) with radius 1.
+# viewBox="-1 0 2 1": only the upper half is visible (y<1); lower half is clipped.
+# SVG y-axis is top-down, so y=1 is the bottom edge of the viewBox.
+# Two strokes: outer glow (wide, low opacity) + sharp inner line.
+_HORIZON_PATH = "M -1,1 A 1,1 0 1 1 1,1 A 1,1 0 1 1 -1,1 Z"
+
+# Page template. string.Template's $-placeholders leave the literal CSS braces
+# as written.
+_HTML_TEMPLATE = Template("""<!DOCTYPE html>
 <html>
 <head>
 <meta charset="utf-8">
 <meta name="viewport" content="width=device-width, initial-scale=1">
 <style>
-* {{ margin: 0; padding: 0; box-sizing: border-box; }}
-html, body {{
+* { margin: 0; padding: 0; box-sizing: border-box; }
+html, body {
     width: 100%;
     height: 100%;
-    background: {_BG};
+    background: ${bg};
     overflow: hidden;
-}}
-canvas#starfield {{
+}
+canvas#starfield {
     position: fixed;
     top: 0; left: 0;
     pointer-events: none;
     z-index: 0;
-}}
-svg#sky {{
+}
+svg#sky {
     display: block;
     position: fixed;
     visibility: hidden;
     cursor: grab;
     touch-action: none;
     z-index: 1;
-}}
-svg#sky.grabbing {{
+}
+svg#sky.grabbing {
     cursor: grabbing;
-}}
-#reset-btn {{
+}
+/* Every pointer/touch on the chart targets svg#sky itself, so a touch event's
+   targetTouches are exactly the fingers on the chart. */
+svg#sky * {
+    pointer-events: none;
+}
+#reset-btn {
     position: fixed;
     bottom: 1rem;
     right: 1rem;
@@ -178,11 +340,24 @@ svg#sky.grabbing {{
     z-index: 100;
     user-select: none;
     pointer-events: auto;
-}}
-#reset-btn:hover {{
+}
+#reset-btn:hover {
     background: rgba(201,169,110,0.15);
-}}
-#save-btn {{ display: none; }}
+}
+#save-btn { display: none; }
+/* Auto-rotation: one turn per 10 minutes about the horizon centre (0,1).
+   svg_2d.js adds .spin where CSS transforms apply to SVG, .paused when hidden. */
+@keyframes sky-rot {
+    from { transform: rotate(0deg); }
+    to { transform: rotate(360deg); }
+}
+#rotating.spin {
+    transform-origin: 0px 1px;
+    animation: sky-rot 600s linear infinite;
+}
+#rotating.spin.paused {
+    animation-play-state: paused;
+}
 </style>
 </head>
 <body>
@@ -190,571 +365,88 @@ svg#sky.grabbing {{
 <svg id="sky" viewBox="-1 0 2 1" xmlns="http://www.w3.org/2000/svg"
      preserveAspectRatio="none" overflow="visible">
   <defs>
-    {defs_svg}
+    ${defs_svg}
   </defs>
-  <rect x="-1" y="0" width="2" height="1" fill="{_BG}"/>
+  <rect x="-1" y="0" width="2" height="1" fill="${bg}"/>
   <g id="scene">
     <g id="rotating">
-      <g id="lines">
-        {lines_svg}
-      </g>
-      <g id="stars">
-        {stars_svg}
+      <g transform="scale(0.001)">
+        <g id="lines" stroke="${line_color}" stroke-width="2.5" stroke-opacity="0.55">
+          ${lines_svg}
+        </g>
+        <g id="stars">
+          <g id="star-glow">
+          ${glow_svg}
+          </g>
+          <g id="star-core" fill="${star_color}">
+          ${core_svg}
+          </g>
+        </g>
       </g>
     </g>
     <!-- horizon: wide glow stroke + sharp gold line -->
-    <path d="{horizon_path}" fill="none" stroke="{_HORIZON_COLOR}" stroke-width="0.018" stroke-opacity="0.12"/>
-    <path d="{horizon_path}" fill="none" stroke="{_HORIZON_COLOR}" stroke-width="0.005" stroke-opacity="0.85"/>
+    <path d="${horizon_path}" fill="none" stroke="${horizon_color}" stroke-width="0.018" stroke-opacity="0.12"/>
+    <path d="${horizon_path}" fill="none" stroke="${horizon_color}" stroke-width="0.005" stroke-opacity="0.85"/>
   </g>
 </svg>
-<button id="reset-btn">{t("svg_btn_reset", lang)}</button>
-<button id="save-btn">{t("svg_btn_save", lang)}</button>
+<button id="reset-btn">${reset_label}</button>
+<button id="save-btn">${save_label}</button>
+<script type="application/json" id="tns-config">${config_json}</script>
+<script>
+${script}</script>
+</body>
+</html>""")
+
+# _HTML_TEMPLATE with every per-call-invariant field (colors, defs, horizon,
+# script) filled in, split at the per-render fields. render_svg_html() joins
+# these with lines_svg, glow_svg, core_svg, reset_label, save_label and
+# config_json, in that order.
+_HOLE = "\x00"
+_HTML_PARTS: tuple[str, ...] = tuple(
+    _HTML_TEMPLATE.substitute(
+        bg=_BG,
+        line_color=_LINE_COLOR,
+        star_color=_STAR_COLOR,
+        horizon_color=_HORIZON_COLOR,
+        horizon_path=_HORIZON_PATH,
+        defs_svg=_DEFS_SVG,
+        lines_svg=_HOLE,
+        glow_svg=_HOLE,
+        core_svg=_HOLE,
+        reset_label=_HOLE,
+        save_label=_HOLE,
+        config_json=_HOLE,
+        script=_SCRIPT,
+    ).split(_HOLE)
+)
+
+# Loader page for render_svg_html_compressed(): inflates the embedded gzip payload
+# and replaces itself with the result. Inline scripts in the written page run as
+# usual, and the iframe (and its window.parent access) is unchanged. Without
+# DecompressionStream, or if inflating fails, the hidden notice is shown rather
+# than leaving the frame blank.
+_GZIP_SHIM_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"></head>
+<body style="margin:0;background:%s">
+<p id="tns-unsupported" hidden style="margin:2em;color:%s;font:16px sans-serif;text-align:center">%s</p>
 <script>
-(function() {{
-  // ── iframe + SVG fit ─────────────────────────────────────────
-  // viewBox="-1 0 2 1": data y=0 (zenith) → SVG top, data y=1 (horizon centre) → SVG bottom.
-  // preserveAspectRatio="none" requires pixel ratio to match viewBox ratio exactly (2:1)
-  // so the horizon arc remains a true semicircle.
-  // SVG width=2R, height=R → ratio 2:1 ✓
-  // SVG top = CENTRE_TOP_PX - R → screen y of SVG bottom edge = CENTRE_TOP_PX ✓
-  // overflow="visible" on the SVG lets the horizon arc stroke paint outside the box.
-  var CENTRE_TOP_PX = 50;
-  var sky = document.getElementById('sky');
-  var sfCanvas = document.getElementById('starfield');
-  var p = window.parent;
-
-  // ── starfield canvas ──────────────────────────────────────────
-  // Called after fit() sets SVG geometry. Uses the same R/svgTop/vw/vh
-  // values so particles land exactly in the visible screen area.
-  // seededRand: simple deterministic LCG so particles are stable across redraws.
-  function drawStarfield(vw, vh, R, svgTop) {{
-    var dpr = window.devicePixelRatio || 1;
-    sfCanvas.width  = Math.round(vw * dpr);
-    sfCanvas.height = Math.round(vh * dpr);
-    sfCanvas.style.width  = vw + 'px';
-    sfCanvas.style.height = vh + 'px';
-    var ctx = sfCanvas.getContext('2d');
-    ctx.fillStyle = '{_BG}';
-    ctx.fillRect(0, 0, sfCanvas.width, sfCanvas.height);
-
-    // Deterministic PRNG (seeded) so the field doesn't flicker on resize
-    var s = 12345;
-    function rand() {{ s = (s * 1664525 + 1013904223) & 0xffffffff; return (s >>> 0) / 0xffffffff; }}
-    function gauss() {{
-      return Math.sqrt(-2 * Math.log(rand() + 1e-9)) * Math.cos(2 * Math.PI * rand());
-    }}
-
-    // Screen-space dome centre (horizon arc centre): x=vw/2, y=CENTRE_TOP_PX
-    // SVG top = svgTop (negative), so screen y=0 maps to SVG pixel y = -svgTop.
-    // Dome arc centre in screen px: (vw/2, CENTRE_TOP_PX).
-    // Dome radius in screen px: R.
-    var cx = vw / 2 * dpr;
-    var cy = CENTRE_TOP_PX * dpr;  // horizon centre in physical px
-    var cR = R * dpr;
-
-    // Pass 1: sparse uniform across full screen
-    for (var i = 0; i < 2000; i++) {{
-      var px = rand() * sfCanvas.width;
-      var py = rand() * sfCanvas.height;
-      var r  = (0.4 + rand() * 0.6) * dpr;
-      var op = 0.06 + rand() * 0.18;
-      ctx.beginPath(); ctx.arc(px, py, r, 0, 6.283);
-      ctx.fillStyle = 'rgba(210,225,255,' + op.toFixed(2) + ')';
-      ctx.fill();
-    }}
-
-    // Pass 2: blob clusters — 16 centres, each 200 particles, tight sigma
-    for (var b = 0; b < 16; b++) {{
-      var bx = cx + gauss() * cR * 0.7;
-      var by = cy - rand() * cR;  // above horizon (screen y < cy)
-      for (var j = 0; j < 200; j++) {{
-        var px2 = bx + gauss() * cR * 0.08;
-        var py2 = by + gauss() * cR * 0.06;
-        if (px2 < 0 || py2 < 0 || px2 > sfCanvas.width || py2 > sfCanvas.height) continue;
-        var r2  = (0.4 + rand() * 0.7) * dpr;
-        var op2 = 0.15 + rand() * 0.35;
-        ctx.beginPath(); ctx.arc(px2, py2, r2, 0, 6.283);
-        ctx.fillStyle = 'rgba(210,225,255,' + op2.toFixed(2) + ')';
-        ctx.fill();
-      }}
-    }}
-
-    // Pass 3: brighter accent dots
-    for (var k = 0; k < 600; k++) {{
-      var px3 = rand() * sfCanvas.width;
-      var py3 = rand() * sfCanvas.height;
-      var r3  = (0.7 + rand() * 1.0) * dpr;
-      var op3 = 0.22 + rand() * 0.33;
-      ctx.beginPath(); ctx.arc(px3, py3, r3, 0, 6.283);
-      ctx.fillStyle = 'rgba(230,240,255,' + op3.toFixed(2) + ')';
-      ctx.fill();
-    }}
-  }}
-
-  function fit() {{
-    var vw = p.innerWidth;
-    var vh = p.innerHeight;
-    // R: dome radius = 60% of viewport height
-    var R = Math.round(vh * 0.6);
-    var svgLeft = Math.round((vw - 2 * R) / 2);
-    var svgTop  = CENTRE_TOP_PX - R;
-    sky.style.width  = (2 * R) + 'px';
-    sky.style.height = R + 'px';
-    sky.style.left   = svgLeft + 'px';
-    sky.style.top    = svgTop  + 'px';
-    drawStarfield(vw, vh, R, svgTop);
-
-    // Sync iframe to full parent viewport
-    var iframe = null;
-    var frames = p.document.querySelectorAll('iframe');
-    for (var i = 0; i < frames.length; i++) {{
-      if (frames[i].contentWindow === window) {{ iframe = frames[i]; break; }}
-    }}
-    if (iframe) {{
-      iframe.style.width    = vw + 'px';
-      iframe.style.height   = vh + 'px';
-      iframe.style.position = 'fixed';
-      iframe.style.top      = '0';
-      iframe.style.left     = '0';
-      iframe.style.zIndex   = '0';
-      iframe.style.border   = 'none';
-    }}
-    sky.style.visibility = 'visible';
-  }}
-  requestAnimationFrame(function() {{
-    requestAnimationFrame(function() {{
-      fit();
-      // Watch parent DOM for tns-save-trigger marker injected by Streamlit
-      // when the save button is clicked. chart iframe has allow-same-origin
-      // so p.document is accessible.
-      try {{
-        // tns-save-trigger is always in the DOM when sky_data exists.
-        // data-seq=0 means no save yet; seq>=1 means a save was requested.
-        // Strategy: watch for attribute changes on the trigger node (seq increments),
-        // and also handle the case where the node is added after iframe loads.
-        // Initialise _lastSeq from the current data-seq so a seq already in the
-        // DOM when this iframe loads is treated as "already handled".
-        // Only a seq that increments *after* this iframe loaded triggers capture.
-        var _initEl = p.document.getElementById('tns-save-trigger');
-        var _lastSeq = _initEl ? parseInt(_initEl.getAttribute('data-seq') || '0', 10) : 0;
-
-        function _checkTrigger() {{
-          var el = p.document.getElementById('tns-save-trigger');
-          if (!el) return;
-          var seq = parseInt(el.getAttribute('data-seq') || '0', 10);
-          if (seq > _lastSeq) {{
-            _lastSeq = seq;
-            _doCapture(null);
-          }}
-        }}
-
-        var mo = new MutationObserver(function(records) {{
-          for (var ri = 0; ri < records.length; ri++) {{
-            var r = records[ri];
-            // attribute change on the trigger node itself
-            if (r.type === 'attributes' && r.target.id === 'tns-save-trigger') {{
-              _checkTrigger(); return;
-            }}
-            // node added: trigger node newly inserted (e.g. first chart load)
-            var nodes = r.addedNodes;
-            for (var ni = 0; ni < nodes.length; ni++) {{
-              var n = nodes[ni];
-              if ((n.id === 'tns-save-trigger') ||
-                  (n.querySelector && n.querySelector('#tns-save-trigger'))) {{
-                _checkTrigger(); return;
-              }}
-            }}
-          }}
-        }});
-        mo.observe(p.document.body, {{ childList: true, subtree: true, attributes: true, attributeFilter: ['data-seq'] }});
-      }} catch(e) {{}}
-    }});
-  }});
-  p.addEventListener('resize', fit);
-
-  // ── pan + zoom ───────────────────────────────────────────────
-  var svg = document.getElementById('sky');
-  var scene = document.getElementById('scene');
-  var rotating = document.getElementById('rotating');
-  var resetBtn = document.getElementById('reset-btn');
-
-  // transform state in SVG data-units
-  var tx = 0, ty = 0, scale = 1;
-
-  function applyTransform() {{
-    scene.setAttribute('transform', 'translate(' + tx + ',' + ty + ') scale(' + scale + ')');
-    var changed = (tx !== 0 || ty !== 0 || scale !== 1);
-    resetBtn.style.display = changed ? 'block' : 'none';
-  }}
-
-  // ── auto-rotation ────────────────────────────────────────────
-  // Rotate stars+lines around the horizon semicircle centre (SVG coords: cx=0, cy=1).
-  // One full rotation every 10 minutes (600 seconds).
-  var DEG_PER_MS = 360 / (600 * 1000);
-  var rotAngle = 0;
-  var lastTs = null;
-
-  function rotationLoop(ts) {{
-    if (lastTs !== null) {{
-      rotAngle += (ts - lastTs) * DEG_PER_MS;
-      if (rotAngle >= 360) rotAngle -= 360;
-    }}
-    lastTs = ts;
-    rotating.setAttribute('transform', 'rotate(' + rotAngle + ',0,1)');
-    requestAnimationFrame(rotationLoop);
-  }}
-  requestAnimationFrame(rotationLoop);
-
-  // convert mouse/touch clientX/Y → SVG data-unit coords
-  function clientToSVG(clientX, clientY) {{
-    var pt = svg.createSVGPoint();
-    pt.x = clientX;
-    pt.y = clientY;
-    // Use the inverse CTM of the scene's parent (the svg element)
-    var ctm = svg.getScreenCTM();
-    if (!ctm) return {{ x: 0, y: 0 }};
-    var inv = ctm.inverse();
-    return pt.matrixTransform(inv);
-  }}
-
-  // ── mouse pan ────────────────────────────────────────────────
-  var dragging = false;
-  var dragStart = {{ x: 0, y: 0 }};
-  var txAtDrag = 0, tyAtDrag = 0;
-
-  svg.addEventListener('mousedown', function(e) {{
-    if (e.button !== 0) return;
-    dragging = true;
-    svg.classList.add('grabbing');
-    var svgPt = clientToSVG(e.clientX, e.clientY);
-    dragStart = svgPt;
-    txAtDrag = tx;
-    tyAtDrag = ty;
-    e.preventDefault();
-  }});
-
-  window.addEventListener('mousemove', function(e) {{
-    if (!dragging) return;
-    var svgPt = clientToSVG(e.clientX, e.clientY);
-    tx = txAtDrag + (svgPt.x - dragStart.x);
-    ty = tyAtDrag + (svgPt.y - dragStart.y);
-    applyTransform();
-  }});
-
-  window.addEventListener('mouseup', function() {{
-    dragging = false;
-    svg.classList.remove('grabbing');
-  }});
-
-  // ── wheel zoom ───────────────────────────────────────────────
-  svg.addEventListener('wheel', function(e) {{
-    e.preventDefault();
-    // deltaY varies wildly by device/mode (1 line ≈ 3–40px, 1 page ≈ 800px).
-    // Normalise to a fixed step per notch so trackpad doesn't feel 10× faster.
-    var delta = e.deltaY;
-    if (e.deltaMode === 0) {{ delta = delta / 120; }}  // pixel mode → notch units
-    else if (e.deltaMode === 2) {{ delta = delta * 3; }} // page mode → notch units
-    // clamp per-event step to ±3 notches to prevent runaway acceleration
-    delta = Math.max(-3, Math.min(3, delta));
-    var factor = Math.pow(1.06, -delta);
-    var pivot = clientToSVG(e.clientX, e.clientY);
-    // zoom toward pivot: translate so pivot stays fixed
-    tx = pivot.x + (tx - pivot.x) * factor;
-    ty = pivot.y + (ty - pivot.y) * factor;
-    scale *= factor;
-    // clamp zoom
-    if (scale < 0.25) {{ var r = 0.25 / scale; scale = 0.25; tx *= r; ty *= r; }}
-    if (scale > 8)    {{ var r = 8 / scale;    scale = 8;    tx *= r; ty *= r; }}
-    applyTransform();
-  }}, {{ passive: false }});
-
-  // ── touch pan + pinch ────────────────────────────────────────
-  var touches = {{}};
-  var pinchDist0 = null;
-  var scaleAtPinch = 1;
-  var txAtPinch = 0, tyAtPinch = 0;
-  var midAtPinch = null;
-
-  function touchDist(t1, t2) {{
-    var dx = t1.clientX - t2.clientX;
-    var dy = t1.clientY - t2.clientY;
-    return Math.sqrt(dx*dx + dy*dy);
-  }}
-
-  svg.addEventListener('touchstart', function(e) {{
-    e.preventDefault();
-    for (var i = 0; i < e.changedTouches.length; i++) {{
-      var t = e.changedTouches[i];
-      touches[t.identifier] = t;
-    }}
-    var ids = Object.keys(touches);
-    if (ids.length === 1) {{
-      var t = touches[ids[0]];
-      dragging = true;
-      dragStart = clientToSVG(t.clientX, t.clientY);
-      txAtDrag = tx;
-      tyAtDrag = ty;
-    }} else if (ids.length === 2) {{
-      dragging = false;
-      var t1 = touches[ids[0]], t2 = touches[ids[1]];
-      pinchDist0 = touchDist(t1, t2);
-      scaleAtPinch = scale;
-      txAtPinch = tx;
-      tyAtPinch = ty;
-      midAtPinch = clientToSVG(
-        (t1.clientX + t2.clientX) / 2,
-        (t1.clientY + t2.clientY) / 2
-      );
-    }}
-  }}, {{ passive: false }});
-
-  svg.addEventListener('touchmove', function(e) {{
-    e.preventDefault();
-    for (var i = 0; i < e.changedTouches.length; i++) {{
-      var t = e.changedTouches[i];
-      touches[t.identifier] = t;
-    }}
-    var ids = Object.keys(touches);
-    if (ids.length === 1 && dragging) {{
-      var t = touches[ids[0]];
-      var svgPt = clientToSVG(t.clientX, t.clientY);
-      tx = txAtDrag + (svgPt.x - dragStart.x);
-      ty = tyAtDrag + (svgPt.y - dragStart.y);
-      applyTransform();
-    }} else if (ids.length === 2 && pinchDist0 !== null) {{
-      var t1 = touches[ids[0]], t2 = touches[ids[1]];
-      var dist = touchDist(t1, t2);
-      var factor = dist / pinchDist0;
-      scale = scaleAtPinch * factor;
-      if (scale < 0.25) scale = 0.25;
-      if (scale > 8)    scale = 8;
-      // keep pinch midpoint fixed
-      tx = midAtPinch.x * (1 - scale) + txAtPinch * (scale / scaleAtPinch);
-      ty = midAtPinch.y * (1 - scale) + tyAtPinch * (scale / scaleAtPinch);
-      applyTransform();
-    }}
-  }}, {{ passive: false }});
-
-  svg.addEventListener('touchend', function(e) {{
-    for (var i = 0; i < e.changedTouches.length; i++) {{
-      delete touches[e.changedTouches[i].identifier];
-    }}
-    var ids = Object.keys(touches);
-    if (ids.length < 2) {{
-      pinchDist0 = null;
-    }}
-    if (ids.length === 1) {{
-      var t = touches[ids[0]];
-      dragging = true;
-      dragStart = clientToSVG(t.clientX, t.clientY);
-      txAtDrag = tx;
-      tyAtDrag = ty;
-    }} else if (ids.length === 0) {{
-      dragging = false;
-    }}
-  }}, {{ passive: false }});
-
-  // ── reset ────────────────────────────────────────────────────
-  resetBtn.addEventListener('click', function() {{
-    tx = 0; ty = 0; scale = 1;
-    applyTransform();
-  }});
-
-  // ── save button ──────────────────────────────────────────────
-  var saveBtn = document.getElementById('save-btn');
-  saveBtn.addEventListener('click', function() {{
-    saveBtn.disabled = true;
-    _doCapture(function() {{ saveBtn.disabled = false; }});
-  }});
-
-  // ── PNG capture ──────────────────────────────────────────────
-  // Strategy: SVG data URI → <img> → Canvas drawImage (no external deps)
-  //
-  // html2canvas: Edge renders position:fixed SVG as blank.
-  // SVG Blob URL: fragment IDs (url(#sg0)) lose document context in Blob origin
-  //   → radialGradient lookup fails → stars are transparent.
-  // data URI: fragment IDs resolve within the inline SVG <defs> → gradients work.
-  //
-  // SVG position: top = CENTRE_TOP_PX - R, typically negative.
-  // Use 9-arg drawImage to crop only the on-screen slice from the SVG image,
-  // avoiding the off-screen negative-top portion that causes canvas clipping.
-  //
-  // Composite: background fill → starfield canvas → SVG crop → narrative text.
-  var _NARRATIVE = {narrative_js};
-
-  function _doCapture(onDone) {{
-    var vp = window.parent || window;
-    var pw = vp.innerWidth;
-    var ph = vp.innerHeight;
-    var dpr = window.devicePixelRatio || 1;
-
-    // SVG geometry as set by fit() (CSS pixels)
-    var svgW    = parseFloat(sky.style.width)  || pw;
-    var svgH    = parseFloat(sky.style.height) || (pw / 2);
-    var svgLeft = parseFloat(sky.style.left)   || 0;
-    var svgTop  = parseFloat(sky.style.top)    || 0;  // typically negative
-
-    // Output canvas: full viewport in physical pixels
-    var out = document.createElement('canvas');
-    out.width  = Math.round(pw * dpr);
-    out.height = Math.round(ph * dpr);
-    var ctx = out.getContext('2d');
-
-    // Step 1: background + starfield canvas
-    ctx.fillStyle = '{_BG}';
-    ctx.fillRect(0, 0, out.width, out.height);
-    try {{
-      if (sfCanvas && sfCanvas.width > 0) {{
-        ctx.drawImage(sfCanvas, 0, 0, out.width, out.height);
-      }}
-    }} catch(e) {{}}
-
-    // Step 2: serialize live SVG into data URI, snapshotting current transforms.
-    //
-    // The SVG element has:  top = svgTop (negative), height = R.
-    // overflow="visible" means the horizon arc stroke (at y=1 in data-units, the
-    // very bottom of the viewBox) extends slightly below the SVG's pixel boundary.
-    // When the browser rasterises a <img> from an SVG data URI it clips to the
-    // declared pixel height — so we must give the clone extra height to prevent
-    // the stroke from being cut off.
-    //
-    // Strategy: extend viewBox height (y stays at 0) so overflow="visible" horizon
-    // stroke is included in the rasterised image, while keeping the 1 data-unit = R px
-    // scale intact (width/height change together with the same pixel:data ratio).
-    //
-    // Original: width=2R, height=R, viewBox="-1 0 2 1"  → 1 data-unit = R px
-    // Extended: width=2R, height=extH, viewBox="-1 0 2 vbH"
-    //   vbH = extH / R  → still 1 data-unit = R px, so content positions unchanged.
-    //   y=1 (horizon) still maps to pixel y=R; overflow stroke lands in y=R…extH.
-    //
-    // extH = ph - svgTop  (svgTop < 0, so extH > ph; the image covers svgTop…ph)
-    // drawImage source:
-    //   sx = 0 (svgLeft >= 0, no horizontal off-screen; centred dome fits in viewport)
-    //   sy = -svgTop  (skip the above-screen portion; image top = screen y=svgTop)
-    //   sw = pw, sh = ph  (paint exactly the full viewport)
-    //   dx=0, dy=0, dw=pw*dpr, dh=ph*dpr
-    var R    = svgH;                  // svgH = R from fit()
-    var extH = ph - svgTop;           // svgTop <= 0 → extH >= ph
-    var vbH  = extH / R;              // viewBox height in data-units
-
-    var svgEl    = document.getElementById('sky');
-    var clone    = svgEl.cloneNode(true);
-    clone.setAttribute('width',  svgW);   // keep original pixel width (= 2R)
-    clone.setAttribute('height', extH);
-    clone.setAttribute('viewBox', '-1 0 2 ' + vbH.toFixed(6));
-    var rotEl    = svgEl.querySelector('#rotating');
-    var cloneRot = clone.querySelector('#rotating');
-    if (rotEl && cloneRot) {{
-      cloneRot.setAttribute('transform', rotEl.getAttribute('transform') || '');
-    }}
-    var sceneEl    = svgEl.querySelector('#scene');
-    var cloneScene = clone.querySelector('#scene');
-    if (sceneEl && cloneScene) {{
-      cloneScene.setAttribute('transform', sceneEl.getAttribute('transform') || '');
-    }}
-
-    var svgStr  = new XMLSerializer().serializeToString(clone);
-    // btoa handles only single-byte chars; URI-encode then unescape covers UTF-8
-    var dataUri = 'data:image/svg+xml;base64,' + btoa(unescape(encodeURIComponent(svgStr)));
-
-    // Step 3: ensure the custom font is loaded in this canvas context before drawing.
-    // Canvas 2D does not inherit @font-face from CSS unless the font is already loaded.
-    var _fontSpec = 'italic 16px "NostalgicPoliceHumanRights"';
-    var _fontUrl  = 'https://cdn.jsdelivr.net/gh/projectnoonnu/2601-6@1.0/Griun_PolHumanrights-Rg.woff2';
-    function _drawWithFont(drawFn) {{
-      if (!_NARRATIVE) {{ drawFn(); return; }}
-      // FontFace API available in all modern browsers
-      if (typeof FontFace !== 'undefined' && document.fonts) {{
-        var ff = new FontFace('NostalgicPoliceHumanRights', 'url(' + _fontUrl + ')', {{ style: 'italic' }});
-        ff.load().then(function(loaded) {{
-          document.fonts.add(loaded);
-          drawFn();
-        }}).catch(function() {{ drawFn(); }});
-      }} else {{
-        drawFn();
-      }}
-    }}
-
-    var img = new Image();
-    img.onload = function() {{
-      // 9-arg drawImage.
-      // Image size: svgW × extH.  Image top-left is at screen (svgLeft, svgTop).
-      // svgTop < 0: image extends above screen top; sy=-svgTop skips that portion.
-      // svgLeft < 0: dome wider than viewport; sx=-svgLeft skips off-screen left portion.
-      // svgLeft > 0: dome narrower than viewport; dx=svgLeft*dpr offsets onto canvas.
-      var sx = svgLeft < 0 ? -svgLeft : 0;
-      var sy = -svgTop;
-      var sw = Math.min(svgW - sx, pw - (svgLeft > 0 ? svgLeft : 0));
-      var sh = ph;
-      var dx = svgLeft > 0 ? Math.round(svgLeft * dpr) : 0;
-      var dy = 0;
-      var dw = sw * dpr;
-      var dh = ph * dpr;
-
-      if (sw > 0 && sh > 0) {{
-        ctx.drawImage(img, sx, sy, sw, sh, dx, dy, dw, dh);
-      }}
-
-      _drawWithFont(function() {{
-        // Step 4: narrative overlay at bottom
-        if (_NARRATIVE) {{
-          var padY     = Math.round(24 * dpr);
-          var fontSize = Math.round(16 * dpr);
-          var lineH    = Math.round(fontSize * 1.75);
-          var maxW     = Math.min(Math.round(pw * dpr * 0.85), Math.round(640 * dpr));
-          var font     = 'italic ' + fontSize + 'px "NostalgicPoliceHumanRights","Apple SD Gothic Neo","Malgun Gothic",sans-serif';
-          ctx.font = font;
-
-          var tokens = _NARRATIVE.split(/\\s+/);
-          var lines = [], cur = '';
-          for (var ti = 0; ti < tokens.length; ti++) {{
-            var tok = tokens[ti];
-            if (!tok) continue;
-            var test = cur ? cur + ' ' + tok : tok;
-            if (ctx.measureText(test).width > maxW && cur) {{
-              lines.push(cur); cur = tok;
-            }} else {{ cur = test; }}
-          }}
-          if (cur) lines.push(cur);
-
-          var boxH = lines.length * lineH + padY * 2;
-          var boxY = out.height - boxH;
-          ctx.fillStyle = 'rgba(10,20,42,0.82)';
-          ctx.fillRect(0, boxY, out.width, boxH);
-          ctx.fillStyle = 'rgba(201,169,110,0.4)';
-          ctx.fillRect(0, boxY, out.width, Math.round(dpr));
-          ctx.font = font;
-          ctx.fillStyle = '#e8d5a3';
-          ctx.textAlign = 'center';
-          ctx.textBaseline = 'top';
-          var ty2 = boxY + padY;
-          for (var li = 0; li < lines.length; li++) {{
-            ctx.fillText(lines[li], Math.round(out.width / 2), ty2);
-            ty2 += lineH;
-          }}
-        }}
-
-        // Step 5: trigger download
-        var a = document.createElement('a');
-        a.href = out.toDataURL('image/png');
-        a.download = '{filename}';
-        document.body.appendChild(a);
-        a.click();
-        document.body.removeChild(a);
-        if (onDone) onDone();
-      }});
-    }};
-    img.onerror = function() {{
-      if (onDone) onDone();
-    }};
-    img.src = dataUri;
-  }}
-
-  window.addEventListener('message', function(e) {{
-    if (!e.data || e.data.type !== 'tns_save') return;
-    _doCapture(null);
-  }});
-}})();
+(function() {
+  function unsupported() {
+    document.getElementById('tns-unsupported').hidden = false;
+  }
+  if (typeof DecompressionStream === 'undefined') {
+    unsupported();
+    return;
+  }
+  var bytes = Uint8Array.from(atob("%s"), function(c) { return c.charCodeAt(0); });
+  var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  new Response(stream).text().then(function(html) {
+    document.open();
+    document.write(html);
+    document.close();
+  }, unsupported);
+})();
 </script>
 </body>
 </html>"""
@@ -6,15 +6,21 @@ Edit the where/when variables at the top, then run:
 
 from dotenv import load_dotenv
 
-load_dotenv()
-
-from thatnightsky.compute import run  # noqa: E402
-from thatnightsky.models import QueryInput  # noqa: E402
-from thatnightsky.renderers.static import save_static_chart  # noqa: E402
+from thatnightsky.compute import run
+from thatnightsky.models import QueryInput
+from thatnightsky.renderers.static import save_static_chart
 
 where = "부산광역시 가야동"
 when = "1995-01-15 00:00"
 
-sky_data = run(QueryInput(address=where, when=when))
-path = save_static_chart(sky_data)
-print(f"Saved: {path}")
+
+def main() -> None:
+    """Compute the sky for `where`/`when` and save it as a PNG chart."""
+    load_dotenv()
+    sky_data = run(QueryInput(address=where, when=when))
+    path = save_static_chart(sky_data)
+    print(f"Saved: {path}")
+
+
+if __name__ == "__main__":
+    main()